@@ -6,21 +6,27 @@ This package contains all AI and ML models for the ZEKO speech therapy applicati
 
 Models included:
 - EmotionDetectionModel: Detects emotions from audio using MFCC + MLP
+- QuantizedEmotionModel: int8 TFLite MFCC + CNN emotion model for fast CPU inference
 - SpeechRecognitionModel: Custom STT with pronunciation scoring
 - AdaptiveLearningModel: Adjusts difficulty based on user performance
 - AudioFeatureExtractor: Extracts MFCC and other audio features
+- ModelRegistry: Shared, process-wide model instances
 """
 
-from .emotion_model import EmotionDetectionModel
+from .emotion_model import EmotionDetectionModel, QuantizedEmotionModel
 from .speech_model import SpeechRecognitionModel
 from .adaptive_learning import AdaptiveLearningModel
 from .audio_features import AudioFeatureExtractor
+from .registry import ModelRegistry, model_registry
 
 __all__ = [
     'EmotionDetectionModel',
+    'QuantizedEmotionModel',
     'SpeechRecognitionModel', 
     'AdaptiveLearningModel',
-    'AudioFeatureExtractor'
+    'AudioFeatureExtractor',
+    'ModelRegistry',
+    'model_registry'
 ]
 
 __version__ = "1.0.0"
@@ -12,9 +12,80 @@ import librosa.display
 from typing import Dict, List, Tuple, Optional
 import logging
 from pathlib import Path
+from scipy.fft import dct
+
+# Optional numba JIT for the MFCC inner loops
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Matches librosa.power_to_db defaults (amin=1e-10, top_db=80)
+_LOG_AMIN = 1e-10
+_TOP_DB = 80.0
+
+
+def _mel_cepstrum_numpy(power_spec: np.ndarray, mel_basis: np.ndarray,
+                        dct_basis: np.ndarray) -> np.ndarray:
+    """
+    Mel projection, log compression and DCT with NumPy (used when numba is missing)
+    """
+    log_mel = 10.0 * np.log10(np.maximum(mel_basis @ power_spec, _LOG_AMIN))
+    log_mel = np.maximum(log_mel, log_mel.max() - _TOP_DB)
+    return (dct_basis @ log_mel).astype(np.float32)
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True, fastmath=True)
+    def _mel_cepstrum(power_spec, mel_basis, dct_basis):
+        """
+        Mel projection, log compression and DCT fused into one JIT kernel
+        
+        Args:
+            power_spec: float32[:, :] power spectrogram (n_bins, n_frames)
+            mel_basis: float32[:, :] mel filterbank (n_mels, n_bins)
+            dct_basis: float32[:, :] orthonormal DCT-II matrix (n_mfcc, n_mels)
+            
+        Returns:
+            float32[:, :] MFCC matrix (n_mfcc, n_frames)
+        """
+        n_mels, n_bins = mel_basis.shape
+        n_mfcc = dct_basis.shape[0]
+        n_frames = power_spec.shape[1]
+        
+        log_mel = np.empty((n_mels, n_frames), dtype=np.float32)
+        for t in prange(n_frames):
+            for m in range(n_mels):
+                acc = np.float32(0.0)
+                for k in range(n_bins):
+                    acc += mel_basis[m, k] * power_spec[k, t]
+                log_mel[m, t] = 10.0 * np.log10(max(acc, _LOG_AMIN))
+        
+        floor = log_mel.max() - _TOP_DB
+        mfcc = np.empty((n_mfcc, n_frames), dtype=np.float32)
+        for t in prange(n_frames):
+            for c in range(n_mfcc):
+                acc = np.float32(0.0)
+                for m in range(n_mels):
+                    acc += dct_basis[c, m] * max(log_mel[m, t], floor)
+                mfcc[c, t] = acc
+        return mfcc
+else:
+    _mel_cepstrum = _mel_cepstrum_numpy
+
+
+def warmup_feature_kernels():
+    """
+    Trigger JIT compilation on a tiny input so the first request doesn't pay for it
+    """
+    spec = np.ones((8, 4), dtype=np.float32)
+    mel_basis = np.ones((4, 8), dtype=np.float32)
+    dct_basis = np.ones((2, 4), dtype=np.float32)
+    _mel_cepstrum(spec, mel_basis, dct_basis)
+
 class AudioFeatureExtractor:
     """
     Extract audio features for ML models
@@ -38,6 +109,9 @@ class AudioFeatureExtractor:
         self.n_mfcc = n_mfcc
         self.n_fft = n_fft
         self.hop_length = hop_length
+        self.n_mels = 128
+        self._mel_basis = None
+        self._dct_basis = None
         
     def load_audio(self, file_path: str) -> Tuple[np.ndarray, int]:
         """
@@ -67,18 +141,40 @@ class AudioFeatureExtractor:
             MFCC feature matrix (n_mfcc, time_frames)
         """
         try:
-            mfcc = librosa.feature.mfcc(
+            mel_basis, dct_basis = self._get_mfcc_bases()
+            power_spec = np.abs(librosa.stft(
                 y=audio,
-                sr=self.sample_rate,
-                n_mfcc=self.n_mfcc,
                 n_fft=self.n_fft,
                 hop_length=self.hop_length
+            )) ** 2
+            mfcc = _mel_cepstrum(
+                np.ascontiguousarray(power_spec, dtype=np.float32),
+                mel_basis,
+                dct_basis
             )
             return mfcc
         except Exception as e:
             logger.error(f"Error extracting MFCC: {e}")
             raise
     
+    def _get_mfcc_bases(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Build (once) the mel filterbank and DCT matrices used by extract_mfcc
+        
+        Returns:
+            Tuple of (mel_basis, dct_basis) as contiguous float32 arrays
+        """
+        if self._mel_basis is None:
+            mel_basis = librosa.filters.mel(
+                sr=self.sample_rate,
+                n_fft=self.n_fft,
+                n_mels=self.n_mels
+            )
+            dct_basis = dct(np.eye(self.n_mels), type=2, norm='ortho', axis=0)[:self.n_mfcc]
+            self._mel_basis = np.ascontiguousarray(mel_basis, dtype=np.float32)
+            self._dct_basis = np.ascontiguousarray(dct_basis, dtype=np.float32)
+        return self._mel_basis, self._dct_basis
+    
     def extract_chroma(self, audio: np.ndarray) -> np.ndarray:
         """
         Extract chroma features (pitch class profiles)
@@ -9,6 +9,7 @@ Designed specifically for children's speech emotion detection.
 import numpy as np
 import pickle
 import logging
+import threading
 from typing import Dict, List, Tuple, Optional
 from sklearn.neural_network import MLPClassifier
 from sklearn.preprocessing import StandardScaler
@@ -19,8 +20,19 @@ from pathlib import Path
 
 from .audio_features import AudioFeatureExtractor
 
+# Optional TFLite runtime for quantized (int8) inference
+try:
+    from tflite_runtime.interpreter import Interpreter as TFLiteInterpreter
+except ImportError:
+    try:
+        from tensorflow.lite import Interpreter as TFLiteInterpreter
+    except ImportError:
+        TFLiteInterpreter = None
+
 logger = logging.getLogger(__name__)
 
+EMOTION_LABELS = ['happy', 'sad', 'excited', 'calm', 'frustrated', 'confident']
+
 class EmotionDetectionModel:
     """
     Emotion detection model for children's speech
@@ -34,7 +46,7 @@ class EmotionDetectionModel:
         Args:
             model_path: Path to pre-trained model file
         """
-        self.emotions = ['happy', 'sad', 'excited', 'calm', 'frustrated', 'confident']
+        self.emotions = list(EMOTION_LABELS)
         self.feature_extractor = AudioFeatureExtractor()
         self.model = None
         self.scaler = None
@@ -370,6 +382,129 @@ class EmotionDetectionModel:
             return emotion_recs[np.random.randint(len(emotion_recs))]
 
 
+class QuantizedEmotionModel:
+    """
+    Post-training quantized (int8) MFCC + CNN emotion model served through TFLite.
+    The int8 graph is small enough to stay in CPU cache and runs far faster than
+    the FP32 MLP, so it is the preferred path for the /detect endpoint.
+    """
+    
+    def __init__(self, model_path: Optional[str] = None, n_mfcc: int = 20):
+        """
+        Initialize quantized emotion model
+        
+        Args:
+            model_path: Path to int8 .tflite model file
+            n_mfcc: Number of MFCC coefficients the model was trained on
+        """
+        self.emotions = list(EMOTION_LABELS)
+        self.feature_extractor = AudioFeatureExtractor(n_mfcc=n_mfcc)
+        self.interpreter = None
+        self.input_details = None
+        self.output_details = None
+        # TFLite interpreters are not thread-safe; inference runs in worker threads
+        self._lock = threading.Lock()
+        
+        if model_path and Path(model_path).exists():
+            self.load_model(model_path)
+    
+    @property
+    def is_available(self) -> bool:
+        return self.interpreter is not None
+    
+    def load_model(self, model_path: str):
+        """
+        Load quantized TFLite model from disk
+        
+        Args:
+            model_path: Path to .tflite model file
+        """
+        if TFLiteInterpreter is None:
+            logger.warning("TFLite runtime not installed, quantized emotion model disabled")
+            return
+        
+        try:
+            interpreter = TFLiteInterpreter(model_path=model_path)
+            interpreter.allocate_tensors()
+            
+            self.input_details = interpreter.get_input_details()[0]
+            self.output_details = interpreter.get_output_details()[0]
+            self.interpreter = interpreter
+            logger.info(f"Quantized emotion model loaded from {model_path}")
+            
+        except Exception as e:
+            logger.error(f"Error loading quantized emotion model: {e}")
+            self.interpreter = None
+    
+    def prepare_input(self, audio_file: str) -> np.ndarray:
+        """
+        Extract MFCC matrix and quantize it to the model's int8 input tensor
+        
+        Args:
+            audio_file: Path to audio file
+            
+        Returns:
+            Quantized input tensor
+        """
+        audio, _ = self.feature_extractor.load_audio(audio_file)
+        mfcc = self.feature_extractor.extract_mfcc(audio).astype(np.float32)
+        
+        # Input layout is (1, n_mfcc, n_frames[, 1]); crop or zero-pad the time axis
+        input_shape = self.input_details['shape']
+        n_frames = int(input_shape[2])
+        if mfcc.shape[1] >= n_frames:
+            mfcc = mfcc[:, :n_frames]
+        else:
+            mfcc = np.pad(mfcc, ((0, 0), (0, n_frames - mfcc.shape[1])))
+        
+        scale, zero_point = self.input_details['quantization']
+        dtype = self.input_details['dtype']
+        if scale:
+            info = np.iinfo(dtype)
+            mfcc = np.clip(np.round(mfcc / scale + zero_point), info.min, info.max)
+        
+        return mfcc.astype(dtype).reshape(input_shape)
+    
+    def predict(self, audio_file: str) -> Dict[str, float]:
+        """
+        Predict emotion from audio file using the int8 model
+        
+        Args:
+            audio_file: Path to audio file
+            
+        Returns:
+            Dictionary with emotion probabilities (same format as EmotionDetectionModel.predict)
+        """
+        if not self.is_available:
+            raise ValueError("Quantized emotion model is not loaded")
+        
+        input_tensor = self.prepare_input(audio_file)
+        
+        with self._lock:
+            self.interpreter.set_tensor(self.input_details['index'], input_tensor)
+            self.interpreter.invoke()
+            output = self.interpreter.get_tensor(self.output_details['index'])[0]
+        
+        # Dequantize output scores
+        scale, zero_point = self.output_details['quantization']
+        probabilities = output.astype(np.float32)
+        if scale:
+            probabilities = (probabilities - zero_point) * scale
+        total = float(np.sum(probabilities))
+        if total > 0:
+            probabilities = probabilities / total
+        
+        predicted_idx = int(np.argmax(probabilities))
+        
+        return {
+            'predicted_emotion': self.emotions[predicted_idx],
+            'confidence': float(probabilities[predicted_idx]),
+            'emotion_probabilities': {
+                emotion: float(prob) for emotion, prob in zip(self.emotions, probabilities)
+            }
+        }
+
+
 # Helper functions for convenience
 def detect_emotion_from_audio(audio_file: str, model_path: Optional[str] = None) -> Dict[str, float]:
     """
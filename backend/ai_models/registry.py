@@ -0,0 +1,53 @@
+"""
+Model Registry for ZEKO
+=======================
+
+Process-wide AI model instances shared by all routers, so every model is
+constructed (and its weights loaded) once per process instead of once per router.
+"""
+
+import os
+import logging
+from pathlib import Path
+
+from .emotion_model import EmotionDetectionModel, QuantizedEmotionModel
+from .speech_model import SpeechRecognitionModel
+from .adaptive_learning import AdaptiveLearningModel
+from .audio_features import AudioFeatureExtractor, warmup_feature_kernels
+
+logger = logging.getLogger(__name__)
+
+class ModelRegistry:
+    """
+    Holds the shared model instances
+    """
+    
+    def __init__(self):
+        # Trained weights are loaded in warmup(), once .env has been applied
+        self.emotion_model = EmotionDetectionModel()
+        self.quantized_emotion_model = QuantizedEmotionModel()
+        self.speech_model = SpeechRecognitionModel()
+        self.adaptive_model = AdaptiveLearningModel()
+        self.audio_extractor = AudioFeatureExtractor()
+    
+    def warmup(self):
+        """
+        Prepare models before the first request (call once at app startup)
+        """
+        emotion_model_path = os.getenv("EMOTION_MODEL_PATH")
+        if emotion_model_path and Path(emotion_model_path).exists() and not self.emotion_model.is_trained:
+            self.emotion_model.load_model(emotion_model_path)
+        
+        tflite_model_path = os.getenv("EMOTION_TFLITE_MODEL_PATH")
+        if tflite_model_path and Path(tflite_model_path).exists() and not self.quantized_emotion_model.is_available:
+            self.quantized_emotion_model.load_model(tflite_model_path)
+        
+        # Compile feature extraction kernels so the first request doesn't pay for it
+        warmup_feature_kernels()
+        logger.info(
+            f"AI models ready (emotion trained: {self.emotion_model.is_trained}, "
+            f"quantized emotion: {self.quantized_emotion_model.is_available})"
+        )
+
+# Global instance
+model_registry = ModelRegistry()
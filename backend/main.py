@@ -1,49 +1,50 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from datetime import datetime
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import uvicorn
 import os
 from dotenv import load_dotenv
 
-# Import routers
-from routers import speech, emotion, progress, gamification, ai_models
-
-# Load environment variables
+# Load environment variables before the app modules read them
 load_dotenv()
 
-# Initialize FastAPI app
-app = FastAPI(
-    title="ZEKO Backend API",
-    description="AI-powered speech training API for children with ADHD",
-    version="1.0.0",
-    docs_url="/api/docs",
-    redoc_url="/api/redoc"
-)
-
-# CORS middleware configuration
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        "http://localhost:8081",  # Expo web
-        "exp://localhost:8081",   # Expo Go
-        "http://localhost:3000",  # React web (if any)
-        "*"  # For development only - restrict in production
-    ],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Import routers
+from routers import speech, emotion, progress, gamification, ai_models
+from ai_models.registry import model_registry
+from services.firebase import firebase_service
+from services.google_cloud import google_cloud_service
+from utils.helpers import warmup_syllable_kernel, start_activity_flusher, stop_activity_flusher
 
-# Include routers
-app.include_router(speech.router, prefix="/api/speech", tags=["Speech Training"])
-app.include_router(emotion.router, prefix="/api/emotion", tags=["Emotion Detection"])
-app.include_router(progress.router, prefix="/api/progress", tags=["User Progress"])
-app.include_router(gamification.router, prefix="/api/gamification", tags=["Gamification"])
-app.include_router(ai_models.router, prefix="/api/ai", tags=["AI Models & Training"])
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup/shutdown hooks"""
+    # Blocking SDK calls (Google Cloud, Storage, model inference) run via asyncio.to_thread
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=int(os.getenv("THREAD_POOL_WORKERS", "32")))
+    )
+    # Async Firestore client must be created on the serving event loop
+    await firebase_service.startup()
+    google_cloud_service.startup()
+    # Load shared AI models before the first request arrives
+    model_registry.warmup()
+    warmup_syllable_kernel()
+    log_drain_task = gamification.start_log_drain()
+    activity_flush_task = start_activity_flusher()
+    yield
+    # Each step runs even if an earlier one fails, so queued sessions are always committed
+    try:
+        await stop_activity_flusher(activity_flush_task)
+    finally:
+        try:
+            await gamification.stop_log_drain(log_drain_task)
+        finally:
+            await firebase_service.shutdown()
 
-# Health check endpoint
-@app.get("/")
+# Health check endpoints
 async def root():
     return {
         "message": "ZEKO Backend API is running!",
@@ -59,7 +60,6 @@ async def root():
         }
     }
 
-@app.get("/api/health")
 async def health_check():
     """Health check endpoint for monitoring"""
     try:
@@ -96,7 +96,7 @@ async def health_check():
             }
         }
     except Exception as e:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=503,
             content={
                 "status": "unhealthy",
@@ -106,9 +106,8 @@ async def health_check():
         )
 
 # Global exception handler
-@app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "message": "Internal server error",
@@ -116,12 +115,54 @@ async def global_exception_handler(request, exc):
         }
     )
 
+def create_app() -> FastAPI:
+    """
+    Build the FastAPI application (served with: uvicorn main:create_app --factory)
+    """
+    app = FastAPI(
+        title="ZEKO Backend API",
+        description="AI-powered speech training API for children with ADHD",
+        version="1.0.0",
+        docs_url="/api/docs",
+        redoc_url="/api/redoc",
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse
+    )
+    
+    # CORS middleware configuration
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[
+            "http://localhost:8081",  # Expo web
+            "exp://localhost:8081",   # Expo Go
+            "http://localhost:3000",  # React web (if any)
+            "*"  # For development only - restrict in production
+        ],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    
+    # Include routers
+    app.include_router(speech.router, prefix="/api/speech", tags=["Speech Training"])
+    app.include_router(emotion.router, prefix="/api/emotion", tags=["Emotion Detection"])
+    app.include_router(progress.router, prefix="/api/progress", tags=["User Progress"])
+    app.include_router(gamification.router, prefix="/api/gamification", tags=["Gamification"])
+    app.include_router(ai_models.router, prefix="/api/ai", tags=["AI Models & Training"])
+    
+    app.add_api_route("/", root, methods=["GET"])
+    app.add_api_route("/api/health", health_check, methods=["GET"])
+    app.add_exception_handler(Exception, global_exception_handler)
+    
+    return app
+
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
     host = os.getenv("HOST", "0.0.0.0")
     
     uvicorn.run(
-        "main:app",
+        "main:create_app",
+        factory=True,
         host=host,
         port=port,
         reload=True if os.getenv("DEBUG") else False,
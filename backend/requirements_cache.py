@@ -0,0 +1,39 @@
+"""
+Requirements install cache shared by the startup scripts
+Only uses the standard library, since it runs before dependencies are installed
+"""
+
+import os
+import sys
+import hashlib
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Hash of the last successfully installed requirements.txt
+REQUIREMENTS_HASH_FILE = Path.home() / ".cache" / "zeko" / "requirements.sha256"
+
+def requirements_hash():
+    """
+    Hash requirements.txt together with the running interpreter and environment,
+    so the skip only applies to the virtualenv the requirements were installed into
+    """
+    digest = hashlib.sha256(Path("requirements.txt").read_bytes())
+    digest.update(f"\0{sys.prefix}\0{sys.executable}".encode())
+    return digest.hexdigest()
+
+def requirements_up_to_date():
+    """Check whether pip should be skipped (ZEKO_SKIP_PIP or unchanged requirements)"""
+    if os.getenv("ZEKO_SKIP_PIP"):
+        logger.info("ZEKO_SKIP_PIP set, skipping dependency installation")
+        return True
+    if REQUIREMENTS_HASH_FILE.exists() and REQUIREMENTS_HASH_FILE.read_text().strip() == requirements_hash():
+        logger.info("Dependencies up to date, skipping installation")
+        return True
+    return False
+
+def mark_requirements_installed():
+    """Record the installed requirements hash for the next start"""
+    REQUIREMENTS_HASH_FILE.parent.mkdir(parents=True, exist_ok=True)
+    REQUIREMENTS_HASH_FILE.write_text(requirements_hash())
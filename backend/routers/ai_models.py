@@ -9,21 +9,24 @@ from fastapi import APIRouter, HTTPException, File, UploadFile, BackgroundTasks
 from pydantic import BaseModel
 from typing import Dict, List, Optional, Any
 import logging
-import os
 import asyncio
 from datetime import datetime
 
-from ai_models.emotion_model import EmotionDetectionModel, detect_emotion_from_audio
-from ai_models.speech_model import SpeechRecognitionModel, quick_speech_analysis
+from ai_models.emotion_model import (
+    detect_emotion_from_audio,
+    create_mock_emotion_prediction
+)
+from ai_models.speech_model import quick_speech_analysis
 from ai_models.adaptive_learning import (
-    AdaptiveLearningModel, 
     create_default_user_profile,
     simulate_learning_session,
     DifficultyLevel,
     LearningStyle
 )
 from ai_models.audio_features import extract_audio_features
+from ai_models.registry import model_registry
 from services.firebase import firebase_service
+from utils.helpers import temporary_audio_file
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -74,10 +77,10 @@ class AdaptiveLearningResponse(BaseModel):
     recommendations: List[str]
     character_interaction: str
 
-# Initialize AI models
-emotion_model = EmotionDetectionModel()
-speech_model = SpeechRecognitionModel()
-adaptive_model = AdaptiveLearningModel()
+# Shared AI models
+emotion_model = model_registry.emotion_model
+speech_model = model_registry.speech_model
+adaptive_model = model_registry.adaptive_model
 
 @router.post("/emotion/analyze", response_model=AudioAnalysisResponse)
 async def analyze_emotion(
@@ -88,40 +91,28 @@ async def analyze_emotion(
     Advanced emotion analysis using AI model
     """
     try:
-        # Save uploaded audio temporarily
-        temp_filename = f"temp_emotion_{datetime.now().strftime('%Y%m%d_%H%M%S')}.wav"
-        temp_path = os.path.join(os.getcwd(), "tmp", temp_filename)
-        
-        # Ensure tmp directory exists
-        os.makedirs(os.path.dirname(temp_path), exist_ok=True)
-        
-        with open(temp_path, "wb") as f:
-            content = await audio_file.read()
-            f.write(content)
-        
-        # Analyze emotion
-        if emotion_model.is_trained:
-            result = emotion_model.predict(temp_path)
-            recommendations = [
-                emotion_model.get_emotion_recommendation(
-                    result["predicted_emotion"], 
-                    result["confidence"]
-                )
-            ]
-        else:
-            # Use mock prediction for demonstration
-            from ai_models.emotion_model import create_mock_emotion_prediction
-            result = create_mock_emotion_prediction(bias_positive=True)
-            recommendations = [
-                emotion_model.get_emotion_recommendation(
-                    result["predicted_emotion"],
-                    result["confidence"]
-                )
-            ]
-        
-        # Clean up
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+        content = await audio_file.read()
+        
+        # Save uploaded audio temporarily for the duration of the analysis
+        with temporary_audio_file(content, suffix=".wav") as temp_path:
+            # Analyze emotion
+            if emotion_model.is_trained:
+                result = emotion_model.predict(temp_path)
+                recommendations = [
+                    emotion_model.get_emotion_recommendation(
+                        result["predicted_emotion"], 
+                        result["confidence"]
+                    )
+                ]
+            else:
+                # Use mock prediction for demonstration
+                result = create_mock_emotion_prediction(bias_positive=True)
+                recommendations = [
+                    emotion_model.get_emotion_recommendation(
+                        result["predicted_emotion"],
+                        result["confidence"]
+                    )
+                ]
         
         return AudioAnalysisResponse(
             success=True,
@@ -132,9 +123,6 @@ async def analyze_emotion(
         
     except Exception as e:
         logger.error(f"Error in emotion analysis: {e}")
-        # Clean up on error
-        if 'temp_path' in locals() and os.path.exists(temp_path):
-            os.remove(temp_path)
         raise HTTPException(status_code=500, detail=f"Emotion analysis failed: {str(e)}")
 
 @router.post("/speech/analyze", response_model=AudioAnalysisResponse)
@@ -146,27 +134,16 @@ async def analyze_speech(
     Advanced speech analysis using AI model
     """
     try:
-        # Save uploaded audio temporarily
-        temp_filename = f"temp_speech_{datetime.now().strftime('%Y%m%d_%H%M%S')}.wav"
-        temp_path = os.path.join(os.getcwd(), "tmp", temp_filename)
-        
-        # Ensure tmp directory exists
-        os.makedirs(os.path.dirname(temp_path), exist_ok=True)
-        
-        with open(temp_path, "wb") as f:
-            content = await audio_file.read()
-            f.write(content)
+        content = await audio_file.read()
         
-        # Analyze speech
-        result = await quick_speech_analysis(temp_path, target_word)
+        # Save uploaded audio temporarily for the duration of the analysis
+        with temporary_audio_file(content, suffix=".wav") as temp_path:
+            # Analyze speech
+            result = await quick_speech_analysis(temp_path, target_word)
         
-        recommendations = result.get("suggestions", [])
-        if not recommendations:
-            recommendations = ["Terus berlatih dengan konsisten!"]
-        
-        # Clean up
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+            recommendations = result.get("suggestions", [])
+            if not recommendations:
+                recommendations = ["Terus berlatih dengan konsisten!"]
         
         return AudioAnalysisResponse(
             success=True,
@@ -177,9 +154,6 @@ async def analyze_speech(
         
     except Exception as e:
         logger.error(f"Error in speech analysis: {e}")
-        # Clean up on error
-        if 'temp_path' in locals() and os.path.exists(temp_path):
-            os.remove(temp_path)
         raise HTTPException(status_code=500, detail=f"Speech analysis failed: {str(e)}")
 
 @router.post("/features/extract", response_model=AudioAnalysisResponse)
@@ -190,23 +164,12 @@ async def extract_features(
     Extract audio features for analysis
     """
     try:
-        # Save uploaded audio temporarily
-        temp_filename = f"temp_features_{datetime.now().strftime('%Y%m%d_%H%M%S')}.wav"
-        temp_path = os.path.join(os.getcwd(), "tmp", temp_filename)
-        
-        # Ensure tmp directory exists
-        os.makedirs(os.path.dirname(temp_path), exist_ok=True)
-        
-        with open(temp_path, "wb") as f:
-            content = await audio_file.read()
-            f.write(content)
+        content = await audio_file.read()
         
-        # Extract features
-        features = extract_audio_features(temp_path)
-        
-        # Clean up
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+        # Save uploaded audio temporarily for the duration of the analysis
+        with temporary_audio_file(content, suffix=".wav") as temp_path:
+            # Extract features
+            features = extract_audio_features(temp_path)
         
         return AudioAnalysisResponse(
             success=True,
@@ -217,9 +180,6 @@ async def extract_features(
         
     except Exception as e:
         logger.error(f"Error extracting features: {e}")
-        # Clean up on error
-        if 'temp_path' in locals() and os.path.exists(temp_path):
-            os.remove(temp_path)
         raise HTTPException(status_code=500, detail=f"Feature extraction failed: {str(e)}")
 
 @router.post("/profile/create", response_model=UserProfileResponse)
@@ -375,8 +335,6 @@ async def test_emotion_model():
     Test emotion detection model with mock data
     """
     try:
-        from ai_models.emotion_model import create_mock_emotion_prediction
-        
         # Create multiple test predictions
         test_results = []
         for i in range(5):
@@ -1,20 +1,28 @@
 from fastapi import APIRouter, File, UploadFile, HTTPException, Depends
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-import aiofiles
-import os
+import asyncio
+import random
+from itertools import accumulate
 from typing import Dict, List, Optional
 import logging
 from datetime import datetime
 
 from services.firebase import firebase_service
-from utils.helpers import validate_audio_file, generate_unique_filename
-from ai_models.emotion_model import EmotionDetectionModel, create_mock_emotion_prediction
+from utils.helpers import validate_audio_file, temporary_audio_file
+from ai_models.emotion_model import create_mock_emotion_prediction
+from ai_models.registry import model_registry
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 logger = logging.getLogger(__name__)
 
-# Initialize emotion detection model
-emotion_model = EmotionDetectionModel()
+# Shared emotion detection models
+emotion_model = model_registry.emotion_model
+quantized_emotion_model = model_registry.quantized_emotion_model
+
+# Simulated emotion distribution, biased towards positive emotions for children
+_SIMULATED_EMOTIONS = ("happy", "sad", "excited", "calm", "frustrated", "confident")
+_SIMULATED_CUM_WEIGHTS = tuple(accumulate((0.4, 0.1, 0.3, 0.15, 0.05, 0.25)))
 
 # Pydantic models
 class EmotionDetectionRequest(BaseModel):
@@ -48,44 +56,38 @@ async def detect_emotion(
         if not validate_audio_file(audio_file):
             raise HTTPException(status_code=400, detail="Invalid audio file format")
         
-        # Save uploaded audio temporarily
-        temp_filename = generate_unique_filename(audio_file.filename)
-        temp_path = os.path.join(os.getcwd(), "tmp", temp_filename)
-        
-        # Ensure tmp directory exists
-        os.makedirs(os.path.dirname(temp_path), exist_ok=True)
-        
-        async with aiofiles.open(temp_path, 'wb') as f:
-            content = await audio_file.read()
-            await f.write(content)
+        content = await audio_file.read()
         
-        # TODO: Implement actual emotion detection ML model
-        # For now, use mock prediction or try to use the model if available
-        try:
-            if emotion_model.is_trained:
-                emotion_result = emotion_model.predict(temp_path)
-                # Convert to expected format
-                emotion_result = {
-                    "emotion": emotion_result["predicted_emotion"],
-                    "confidence": emotion_result["confidence"],
-                    "emotions_breakdown": emotion_result["emotion_probabilities"],
-                    "recommendation": emotion_model.get_emotion_recommendation(
-                        emotion_result["predicted_emotion"], 
+        # Save uploaded audio temporarily for the duration of the analysis
+        with temporary_audio_file(content, audio_file.filename) as temp_path:
+            # Prefer the int8 TFLite model, then the MLP, then mock prediction
+            try:
+                if quantized_emotion_model.is_available or emotion_model.is_trained:
+                    active_model = quantized_emotion_model if quantized_emotion_model.is_available else emotion_model
+                    # Run inference in a worker thread so it doesn't block the event loop
+                    emotion_result = await asyncio.to_thread(active_model.predict, temp_path)
+                    # Convert to expected format
+                    emotion_result = {
+                        "emotion": emotion_result["predicted_emotion"],
+                        "confidence": emotion_result["confidence"],
+                        "emotions_breakdown": emotion_result["emotion_probabilities"],
+                        "recommendation": emotion_model.get_emotion_recommendation(
+                            emotion_result["predicted_emotion"], 
+                            emotion_result["confidence"]
+                        ),
+                        "timestamp": datetime.utcnow().isoformat()
+                    }
+                else:
+                    # Use mock prediction
+                    emotion_result = create_mock_emotion_prediction(bias_positive=True)
+                    emotion_result["recommendation"] = emotion_model.get_emotion_recommendation(
+                        emotion_result["predicted_emotion"],
                         emotion_result["confidence"]
-                    ),
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-            else:
-                # Use mock prediction
-                emotion_result = create_mock_emotion_prediction(bias_positive=True)
-                emotion_result["recommendation"] = emotion_model.get_emotion_recommendation(
-                    emotion_result["predicted_emotion"],
-                    emotion_result["confidence"]
-                )
-                emotion_result["timestamp"] = datetime.utcnow().isoformat()
-        except Exception as model_error:
-            logger.warning(f"AI model failed, using fallback: {model_error}")
-            emotion_result = simulate_emotion_detection(temp_path)
+                    )
+                    emotion_result["timestamp"] = datetime.utcnow().isoformat()
+            except Exception as model_error:
+                logger.warning(f"AI model failed, using fallback: {model_error}")
+                emotion_result = simulate_emotion_detection(temp_path)
         
         # Save emotion data to Firebase
         await firebase_service.save_emotion_data(
@@ -96,16 +98,9 @@ async def detect_emotion(
             context=request_data.context
         )
         
-        # Clean up temporary file
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
-        
         return EmotionDetectionResponse(**emotion_result)
         
     except Exception as e:
-        # Clean up on error
-        if 'temp_path' in locals() and os.path.exists(temp_path):
-            os.remove(temp_path)
         raise HTTPException(status_code=500, detail=f"Emotion detection failed: {str(e)}")
 
 @router.get("/history/{user_id}", response_model=EmotionHistoryResponse)
@@ -158,16 +153,10 @@ async def get_emotion_analytics(user_id: str, days: int = 7):
 # Helper functions
 def simulate_emotion_detection(audio_path: str) -> Dict:
     """
-    Simulate emotion detection (placeholder for ML model)
-    TODO: Replace with actual ML model using MFCC features + MLP
+    Simulate emotion detection (fallback when the ML models fail)
     """
-    import random
-    from datetime import datetime
-    
-    emotions = ["happy", "sad", "excited", "calm", "frustrated", "confident"]
-    weights = [0.4, 0.1, 0.3, 0.15, 0.05, 0.25]  # Bias towards positive emotions for children
-    
-    detected_emotion = random.choices(emotions, weights=weights)[0]
+    emotions = _SIMULATED_EMOTIONS
+    detected_emotion = random.choices(emotions, cum_weights=_SIMULATED_CUM_WEIGHTS)[0]
     confidence = random.uniform(0.75, 0.95)
     
     # Generate emotion breakdown
@@ -1,14 +1,31 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
+import asyncio
 import logging
+from collections import Counter
+import math
+import random
 
 from services.firebase import firebase_service
+from utils.helpers import get_average_accuracy
+from routers.progress import invalidate_cached_user_progress
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 logger = logging.getLogger(__name__)
 
+# Point transaction log events, drained by a single background consumer
+# (the queue is created by start_log_drain() on the serving event loop)
+_LOG_QUEUE: Optional[asyncio.Queue] = None
+_LOG_BATCH_MAX = 500  # Firestore WriteBatch limit
+_LOG_WINDOW_SIZE = 100  # Flush after this many events...
+_LOG_WINDOW_SECONDS = 0.2  # ...or after this long, whichever comes first
+
+# Session fields read by _tally_sessions (all sessions of the last 30 days are tallied)
+_TALLY_SESSION_FIELDS = ["activity_type", "accuracy_score"]
+
 # Pydantic models
 class PointAwardRequest(BaseModel):
     user_id: str
@@ -79,15 +96,21 @@ async def award_points(request: PointAwardRequest):
             new_total=new_total,
             new_level=new_level
         )
-        
-        # Log point transaction
-        await firebase_service.log_point_transaction(
-            user_id=request.user_id,
-            points=request.points,
-            reason=request.reason,
-            activity_type=request.activity_type,
-            metadata=request.metadata
-        )
+        invalidate_cached_user_progress(request.user_id)
+        
+        # Log point transaction in the background; not needed for the response
+        transaction = {
+            "user_id": request.user_id,
+            "points": request.points,
+            "reason": request.reason,
+            "activity_type": request.activity_type,
+            "metadata": request.metadata
+        }
+        if _LOG_QUEUE is not None:
+            _LOG_QUEUE.put_nowait(transaction)
+        else:
+            # Log drain not running (outside the app lifespan): write it directly
+            await firebase_service.log_point_transactions_bulk([transaction])
         
         # Generate response message
         message = generate_point_award_message(request.points, level_up, new_level)
@@ -110,29 +133,38 @@ async def get_user_achievements(user_id: str):
     Get all achievements for a user
     """
     try:
-        # Get user achievements
-        user_achievements = await firebase_service.get_user_achievements(user_id)
+        # Get user achievements, progress and recent sessions in one round
+        user_achievements, progress, sessions = await asyncio.gather(
+            firebase_service.get_user_achievements(user_id),
+            firebase_service.get_user_progress(user_id),
+            firebase_service.get_user_sessions(user_id, limit=None, days=30, fields=_TALLY_SESSION_FIELDS),
+            return_exceptions=True
+        )
+        if isinstance(user_achievements, Exception):
+            raise user_achievements
+        if isinstance(progress, Exception) or isinstance(sessions, Exception):
+            logger.error(f"Error loading data for achievement progress: {progress if isinstance(progress, Exception) else sessions}")
+            progress, sessions = {}, []
         
         # Get all available achievements
         all_achievements = get_all_achievements()
         
-        # Calculate progress
-        earned_ids = [ach["id"] for ach in user_achievements]
+        # Calculate progress, tallying sessions once for all achievements
+        earned_by_id = {ach["id"]: ach for ach in user_achievements}
+        activity_counts, perfect_count = _tally_sessions(sessions)
         
         achievement_progress = []
         for achievement in all_achievements:
-            is_earned = achievement["id"] in earned_ids
-            earned_date = None
-            
-            if is_earned:
-                earned_achievement = next(ach for ach in user_achievements if ach["id"] == achievement["id"])
-                earned_date = earned_achievement.get("earned_date")
+            earned_achievement = earned_by_id.get(achievement["id"])
+            is_earned = earned_achievement is not None
             
             achievement_progress.append({
                 **achievement,
                 "is_earned": is_earned,
-                "earned_date": earned_date,
-                "progress": 100 if is_earned else await calculate_achievement_progress(user_id, achievement["id"])
+                "earned_date": earned_achievement.get("earned_date") if is_earned else None,
+                "progress": 100 if is_earned else _progress_for(
+                    achievement["id"], progress, activity_counts, perfect_count
+                )
             })
         
         return {
@@ -223,8 +255,8 @@ async def get_gamification_stats(user_id: str):
         # Get achievements
         achievements = await firebase_service.get_user_achievements(user_id)
         
-        # Get badges
-        badges = await get_user_badges(user_id)
+        # Compute badges from the data already fetched above
+        badges = _compute_badges(progress, achievements)
         
         # Get recent rewards
         recent_rewards = await firebase_service.get_recent_rewards(user_id, limit=5)
@@ -253,63 +285,12 @@ async def get_user_badges(user_id: str):
     """
     try:
         # Get user data
-        progress = await firebase_service.get_user_progress(user_id)
-        achievements = await firebase_service.get_user_achievements(user_id)
-        
-        badges = []
-        
-        # Activity badges
-        if progress.get("total_sessions", 0) >= 10:
-            badges.append({
-                "id": "active_learner",
-                "name": "Pelajar Aktif",
-                "description": "Menyelesaikan 10+ sesi pembelajaran",
-                "icon": "🎯",
-                "color": "#4CAF50"
-            })
-        
-        # Accuracy badges
-        if progress.get("average_accuracy", 0) >= 90:
-            badges.append({
-                "id": "accuracy_expert",
-                "name": "Ahli Akurasi",
-                "description": "Rata-rata akurasi 90%+",
-                "icon": "🎖️",
-                "color": "#FF9800"
-            })
-        
-        # Streak badges
-        if progress.get("current_streak", 0) >= 7:
-            badges.append({
-                "id": "streak_master",
-                "name": "Master Konsistensi",
-                "description": "Belajar 7 hari berturut-turut",
-                "icon": "🔥",
-                "color": "#F44336"
-            })
-        
-        # Level badges
-        current_level = progress.get("current_level", 1)
-        if current_level >= 5:
-            badges.append({
-                "id": "level_explorer",
-                "name": "Penjelajah Tingkat Tinggi",
-                "description": f"Mencapai Level {current_level}",
-                "icon": "⭐",
-                "color": "#9C27B0"
-            })
-        
-        # Achievement badges
-        if len(achievements) >= 5:
-            badges.append({
-                "id": "achievement_hunter",
-                "name": "Pemburu Prestasi",
-                "description": "Meraih 5+ prestasi",
-                "icon": "🏆",
-                "color": "#FFD700"
-            })
+        progress, achievements = await asyncio.gather(
+            firebase_service.get_user_progress(user_id),
+            firebase_service.get_user_achievements(user_id)
+        )
         
-        return badges
+        return _compute_badges(progress, achievements)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get badges: {str(e)}")
@@ -352,7 +333,128 @@ async def get_daily_bonus(user_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get daily bonus: {str(e)}")
 
+# Badge rules: (predicate(progress, achievements), badge template)
+_BADGE_RULES = (
+    (lambda p, a: p.get("total_sessions", 0) >= 10, {
+        "id": "active_learner",
+        "name": "Pelajar Aktif",
+        "description": "Menyelesaikan 10+ sesi pembelajaran",
+        "icon": "🎯",
+        "color": "#4CAF50"
+    }),
+    (lambda p, a: get_average_accuracy(p) >= 90, {
+        "id": "accuracy_expert",
+        "name": "Ahli Akurasi",
+        "description": "Rata-rata akurasi 90%+",
+        "icon": "🎖️",
+        "color": "#FF9800"
+    }),
+    (lambda p, a: p.get("current_streak", 0) >= 7, {
+        "id": "streak_master",
+        "name": "Master Konsistensi",
+        "description": "Belajar 7 hari berturut-turut",
+        "icon": "🔥",
+        "color": "#F44336"
+    }),
+    (lambda p, a: p.get("current_level", 1) >= 5, {
+        "id": "level_explorer",
+        "name": "Penjelajah Tingkat Tinggi",
+        "description": "Mencapai Level {level}",  # filled in per user
+        "icon": "⭐",
+        "color": "#9C27B0"
+    }),
+    (lambda p, a: len(a) >= 5, {
+        "id": "achievement_hunter",
+        "name": "Pemburu Prestasi",
+        "description": "Meraih 5+ prestasi",
+        "icon": "🏆",
+        "color": "#FFD700"
+    })
+)
+
+# Point award message templates, formatted only after one is picked
+_POINT_AWARD_TEMPLATES = (
+    "🌟 Luar biasa! Kamu mendapat {p} poin!",
+    "👏 Bagus sekali! +{p} poin untuk kamu!",
+    "🎉 Hebat! Kamu berhasil meraih {p} poin!",
+    "💫 Fantastis! {p} poin telah ditambahkan!"
+)
+
+# Background log writer
+async def _log_drain_loop():
+    """
+    Drain queued point transactions and write them to Firebase in batches
+    """
+    loop = asyncio.get_running_loop()
+    queue = _LOG_QUEUE
+    
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + _LOG_WINDOW_SECONDS
+        
+        try:
+            while len(batch) < _LOG_WINDOW_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+        except asyncio.CancelledError:
+            # Hand the partial window back so stop_log_drain flushes it
+            for event in batch:
+                queue.put_nowait(event)
+            raise
+        
+        write = asyncio.ensure_future(firebase_service.log_point_transactions_bulk(batch))
+        try:
+            await asyncio.shield(write)
+        except asyncio.CancelledError:
+            # Let the in-flight write finish so its batch isn't lost at shutdown
+            await write
+            raise
+        except Exception as e:
+            logger.error(f"Error writing point transaction batch: {str(e)}")
+
+def start_log_drain() -> asyncio.Task:
+    """Create the log queue and start its consumer (call once at app startup)"""
+    global _LOG_QUEUE
+    _LOG_QUEUE = asyncio.Queue()
+    return asyncio.create_task(_log_drain_loop())
+
+async def stop_log_drain(task: asyncio.Task):
+    """Stop the log consumer and flush whatever is still queued"""
+    global _LOG_QUEUE
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    
+    # Events logged from here on are written directly
+    queue, _LOG_QUEUE = _LOG_QUEUE, None
+    pending = []
+    while not queue.empty():
+        pending.append(queue.get_nowait())
+    for i in range(0, len(pending), _LOG_BATCH_MAX):
+        await firebase_service.log_point_transactions_bulk(pending[i:i + _LOG_BATCH_MAX])
+
 # Helper functions
+def _compute_badges(progress: Dict, achievements: List[Dict]) -> List[Dict]:
+    """
+    Build the badge list from already-fetched progress and achievements
+    """
+    badges = []
+    for predicate, template in _BADGE_RULES:
+        if predicate(progress, achievements):
+            if template["id"] == "level_explorer":
+                level = progress.get("current_level", 1)
+                template = {**template, "description": template["description"].format(level=level)}
+            badges.append(template)
+    
+    return badges
+
 def calculate_level_from_points(total_points: int) -> int:
     """
     Calculate user level based on total points
@@ -366,7 +468,6 @@ def calculate_level_from_points(total_points: int) -> int:
         return 1
     
     # Formula: level = floor(sqrt(total_points / 50)) + 1
-    import math
     level = math.floor(math.sqrt(total_points / 50)) + 1
     return min(level, 100)  # Cap at level 100
 
@@ -384,15 +485,8 @@ def generate_point_award_message(points: int, level_up: bool, new_level: int = N
     """
     Generate encouraging message for point awards
     """
-    messages = [
-        f"🌟 Luar biasa! Kamu mendapat {points} poin!",
-        f"👏 Bagus sekali! +{points} poin untuk kamu!",
-        f"🎉 Hebat! Kamu berhasil meraih {points} poin!",
-        f"💫 Fantastis! {points} poin telah ditambahkan!"
-    ]
-    
-    import random
-    base_message = random.choice(messages)
+    template = _POINT_AWARD_TEMPLATES[random.randrange(len(_POINT_AWARD_TEMPLATES))]
+    base_message = template.format(p=points)
     
     if level_up:
         base_message += f" 🚀 DAN KAMU NAIK KE LEVEL {new_level}!"
@@ -496,54 +590,71 @@ def get_all_achievements() -> List[Dict]:
         }
     ]
 
+def _tally_sessions(sessions: List[Dict]) -> tuple:
+    """
+    Count sessions per activity type and perfect-accuracy sessions in one pass
+    """
+    activity_counts = Counter()
+    perfect_count = 0
+    for session in sessions:
+        activity_counts[session.get("activity_type")] += 1
+        if session.get("accuracy_score", 0) == 100:
+            perfect_count += 1
+    
+    return activity_counts, perfect_count
+
+def _progress_for(achievement_id: str, progress: Dict, activity_counts: Counter, perfect_count: int) -> float:
+    """
+    Calculate progress towards an achievement from pre-tallied session data
+    """
+    if achievement_id == "first_speech":
+        return min(activity_counts["speech_training"] * 100, 100)
+    
+    elif achievement_id == "accuracy_master":
+        average_accuracy = get_average_accuracy(progress)
+        if average_accuracy >= 95:
+            return 100
+        return average_accuracy
+    
+    elif achievement_id == "point_collector_100":
+        return min((progress.get("total_points", 0) / 100) * 100, 100)
+    
+    elif achievement_id == "point_collector_1000":
+        return min((progress.get("total_points", 0) / 1000) * 100, 100)
+    
+    elif achievement_id == "streak_warrior_3":
+        return min((progress.get("current_streak", 0) / 3) * 100, 100)
+    
+    elif achievement_id == "streak_warrior_7":
+        return min((progress.get("current_streak", 0) / 7) * 100, 100)
+    
+    elif achievement_id == "storyteller":
+        return min((activity_counts["storytelling"] / 10) * 100, 100)
+    
+    elif achievement_id == "singer":
+        return min((activity_counts["singing"] / 10) * 100, 100)
+    
+    elif achievement_id == "level_5":
+        return min((progress.get("current_level", 1) / 5) * 100, 100)
+    
+    elif achievement_id == "perfect_week":
+        # Check for perfect accuracy in the last 7 days
+        if perfect_count >= 7:
+            return 100
+        return (perfect_count / 7) * 100
+    
+    return 0
+
 async def calculate_achievement_progress(user_id: str, achievement_id: str) -> float:
     """
     Calculate progress towards a specific achievement
     """
     try:
         progress = await firebase_service.get_user_progress(user_id)
-        sessions = await firebase_service.get_user_sessions(user_id, days=30)
-        
-        if achievement_id == "first_speech":
-            speech_sessions = [s for s in sessions if s.get("activity_type") == "speech_training"]
-            return min(len(speech_sessions) * 100, 100)
-        
-        elif achievement_id == "accuracy_master":
-            if progress.get("average_accuracy", 0) >= 95:
-                return 100
-            return progress.get("average_accuracy", 0)
-        
-        elif achievement_id == "point_collector_100":
-            return min((progress.get("total_points", 0) / 100) * 100, 100)
+        sessions = await firebase_service.get_user_sessions(user_id, limit=None, days=30, fields=_TALLY_SESSION_FIELDS)
         
-        elif achievement_id == "point_collector_1000":
-            return min((progress.get("total_points", 0) / 1000) * 100, 100)
-        
-        elif achievement_id == "streak_warrior_3":
-            return min((progress.get("current_streak", 0) / 3) * 100, 100)
-        
-        elif achievement_id == "streak_warrior_7":
-            return min((progress.get("current_streak", 0) / 7) * 100, 100)
-        
-        elif achievement_id == "storyteller":
-            storytelling_sessions = [s for s in sessions if s.get("activity_type") == "storytelling"]
-            return min((len(storytelling_sessions) / 10) * 100, 100)
-        
-        elif achievement_id == "singer":
-            singing_sessions = [s for s in sessions if s.get("activity_type") == "singing"]
-            return min((len(singing_sessions) / 10) * 100, 100)
-        
-        elif achievement_id == "level_5":
-            return min((progress.get("current_level", 1) / 5) * 100, 100)
-        
-        elif achievement_id == "perfect_week":
-            # Check for perfect accuracy in the last 7 days
-            recent_sessions = [s for s in sessions if s.get("accuracy_score", 0) == 100]
-            if len(recent_sessions) >= 7:
-                return 100
-            return (len(recent_sessions) / 7) * 100
-        
-        return 0
+        activity_counts, perfect_count = _tally_sessions(sessions)
+        return _progress_for(achievement_id, progress, activity_counts, perfect_count)
         
     except Exception as e:
         logger.error(f"Error calculating achievement progress: {str(e)}")
@@ -1,14 +1,100 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+import asyncio
 import logging
+import random
+import time
+import numpy as np
+from bisect import bisect_right
+from collections import Counter
+from cachetools import TTLCache
 
 from services.firebase import firebase_service
+from utils.helpers import get_average_accuracy
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Achievement definitions awarded by check_new_achievements
+ACHIEVEMENT_DEFINITIONS = {
+    "first_speech": {
+        "name": "Pembicara Pertama",
+        "description": "Menyelesaikan latihan bicara pertama",
+        "icon": "🎤"
+    },
+    "accuracy_master": {
+        "name": "Master Akurasi",
+        "description": "Mencapai akurasi 95% atau lebih",
+        "icon": "🎯"
+    },
+    "point_collector": {
+        "name": "Kolektor Poin",
+        "description": "Mengumpulkan 1000 poin",
+        "icon": "💎"
+    },
+    "streak_warrior": {
+        "name": "Pejuang Konsisten",
+        "description": "Belajar 7 hari berturut-turut",
+        "icon": "🔥"
+    },
+    "level_5": {
+        "name": "Penjelajah Level 5",
+        "description": "Mencapai Level 5",
+        "icon": "⭐"
+    }
+}
+
+# Achievement triggers, grouped by what they depend on (thresholds sorted ascending)
+ACTIVITY_FIRSTS = {"speech_training": "first_speech"}
+ACCURACY_THRESHOLDS = [(95, "accuracy_master")]
+POINT_THRESHOLDS = [(1000, "point_collector")]
+STREAK_THRESHOLDS = [(7, "streak_warrior")]
+LEVEL_ACHIEVEMENT_THRESHOLDS = [(5, "level_5")]
+
+# Progress fields that are derived from the current state and written as-is
+PROGRESS_SET_FIELDS = (
+    "current_level",
+    "current_streak",
+    "favorite_activity",
+    "favorite_activity_count",
+    "earned_achievement_ids",
+    "last_session_date",
+    "last_updated"
+)
+
+# Points needed to reach each level: level n starts at (n - 1) * 150 points
+LEVEL_POINT_BOUNDARIES = [level * 150 for level in range(200)]
+
+# Upper bounds for the stats endpoint: sessions read per request (for averages, insights
+# and trends; totals beyond it come from aggregation queries) and points per trend line
+STATS_SESSION_LIMIT = 500
+STATS_SESSION_FIELDS = ["activity_type", "accuracy_score", "points_earned", "completion_time", "timestamp"]
+TREND_MAX_POINTS = 100
+
+# Session fields needed to rebuild weekly_progress for documents written before it existed
+WEEKLY_SESSION_FIELDS = ["points_earned", "timestamp"]
+
+# Leaderboard cache: (period, limit) -> (expires_at, (rankings, total_participants))
+# Entries expire at their own jittered expires_at; the TTLCache bounds size and lifetime
+_LEADERBOARD_TTL_SECONDS = 120
+_LEADERBOARD_JITTER_SECONDS = (15, 120)  # Spread refreshes so they don't line up
+_LEADERBOARD_MAX_LIMIT = 100
+_LEADERBOARD_CACHE = TTLCache(maxsize=256, ttl=_LEADERBOARD_TTL_SECONDS + _LEADERBOARD_JITTER_SECONDS[1])
+_LEADERBOARD_LOCK = asyncio.Lock()
+
+# Short-lived per-user progress cache for dashboard reads: user_id -> (expires_at, progress)
+_PROGRESS_CACHE: Dict[str, tuple] = {}
+_PROGRESS_CACHE_TTL_SECONDS = 10
+_PROGRESS_CACHE_MAX_ENTRIES = 1024
+
+# Available achievements are global reference data: (expires_at, achievements)
+_AVAILABLE_ACHIEVEMENTS_CACHE: Optional[tuple] = None
+_AVAILABLE_ACHIEVEMENTS_LOCK = asyncio.Lock()
+_AVAILABLE_ACHIEVEMENTS_TTL_SECONDS = 3600
+_AVAILABLE_ACHIEVEMENTS_EMPTY_TTL_SECONDS = 30  # An empty list may be a failed read, so retry soon
+
 # Pydantic models
 class ProgressUpdateRequest(BaseModel):
     user_id: str
@@ -49,18 +135,18 @@ async def get_user_progress(user_id: str):
     Get comprehensive user progress information
     """
     try:
-        # Get user progress from Firebase
-        progress_data = await firebase_service.get_user_progress(user_id)
+        # Get user progress and achievements from Firebase concurrently
+        progress_data, achievements = await asyncio.gather(
+            get_cached_user_progress(user_id),
+            firebase_service.get_user_achievements(user_id)
+        )
         
         if not progress_data:
             # Initialize new user progress
             progress_data = await firebase_service.initialize_user_progress(user_id)
         
-        # Calculate weekly progress
-        weekly_progress = await calculate_weekly_progress(user_id)
-        
-        # Get achievements
-        achievements = await firebase_service.get_user_achievements(user_id)
+        # Weekly progress is aggregated on the progress document at write time
+        weekly_progress = recent_weekly_progress(await ensure_weekly_progress(user_id, progress_data))
         
         return ProgressResponse(
             user_id=user_id,
@@ -68,7 +154,7 @@ async def get_user_progress(user_id: str):
             current_level=progress_data.get("current_level", 1),
             current_streak=progress_data.get("current_streak", 0),
             total_sessions=progress_data.get("total_sessions", 0),
-            average_accuracy=progress_data.get("average_accuracy", 0.0),
+            average_accuracy=get_average_accuracy(progress_data),
             favorite_activity=progress_data.get("favorite_activity", "speech_training"),
             weekly_progress=weekly_progress,
             achievements=achievements
@@ -89,7 +175,8 @@ async def update_progress(request: ProgressUpdateRequest):
         if not current_progress:
             current_progress = await firebase_service.initialize_user_progress(request.user_id)
         
-        # Calculate new progress
+        # Calculate new progress (older documents get their weekly map rebuilt first)
+        await ensure_weekly_progress(request.user_id, current_progress)
         updated_progress = calculate_progress_update(current_progress, request)
         
         # Check for level up
@@ -98,8 +185,10 @@ async def update_progress(request: ProgressUpdateRequest):
         # Check for new achievements
         new_achievements = await check_new_achievements(request.user_id, updated_progress, request)
         
-        # Save updated progress
-        await firebase_service.update_user_progress(request.user_id, updated_progress)
+        # Save updated progress (counters as atomic increments)
+        increments, updates, deletes = build_progress_write(current_progress, updated_progress, request)
+        await firebase_service.apply_progress_update(request.user_id, increments, updates, deletes)
+        invalidate_cached_user_progress(request.user_id)
         
         # Save session data
         await firebase_service.save_session_data(request.user_id, {
@@ -138,10 +227,19 @@ async def get_user_stats(user_id: str, days: int = 30):
     """
     try:
         # Get user sessions from the last N days
-        sessions_data = await firebase_service.get_user_sessions(user_id, days)
+        sessions_data = await firebase_service.get_user_sessions(
+            user_id, limit=STATS_SESSION_LIMIT, days=days, fields=STATS_SESSION_FIELDS
+        )
         
         # Calculate statistics
         stats = calculate_user_statistics(sessions_data)
+        if len(sessions_data) >= STATS_SESSION_LIMIT:
+            # Only the most recent sessions were read; count the rest server-side
+            totals = await firebase_service.get_user_session_totals(
+                user_id, days=days, activity_types=list(stats["activity_breakdown"])
+            )
+            if totals:
+                apply_session_totals(stats, totals)
         
         # Generate learning insights
         insights = generate_learning_insights(stats, sessions_data)
@@ -169,15 +267,13 @@ async def get_leaderboard(period: str = "weekly", limit: int = 10, user_id: str
     Get leaderboard rankings
     """
     try:
-        # Get leaderboard data from Firebase
-        leaderboard_data = await firebase_service.get_leaderboard(period, limit)
-        
-        # Find user rank if user_id is provided
-        user_rank = None
-        if user_id:
-            user_rank = await firebase_service.get_user_rank(user_id, period)
+        limit = min(max(limit, 1), _LEADERBOARD_MAX_LIMIT)
         
-        total_participants = await firebase_service.get_total_participants(period)
+        # Get (cached) leaderboard data and the uncached user rank concurrently
+        (leaderboard_data, total_participants), user_rank = await asyncio.gather(
+            get_cached_leaderboard(period, limit),
+            firebase_service.get_user_rank(user_id, period) if user_id else _none()
+        )
         
         return LeaderboardResponse(
             rankings=leaderboard_data,
@@ -194,8 +290,10 @@ async def get_achievements(user_id: str):
     Get all achievements for a user
     """
     try:
-        achievements = await firebase_service.get_user_achievements(user_id)
-        available_achievements = await firebase_service.get_available_achievements()
+        achievements, available_achievements = await asyncio.gather(
+            firebase_service.get_user_achievements(user_id),
+            get_cached_available_achievements()
+        )
         
         return {
             "user_id": user_id,
@@ -208,31 +306,125 @@ async def get_achievements(user_id: str):
         raise HTTPException(status_code=500, detail=f"Failed to get achievements: {str(e)}")
 
 # Helper functions
-async def calculate_weekly_progress(user_id: str) -> Dict[str, int]:
+async def get_cached_available_achievements() -> List[Dict]:
     """
-    Calculate progress for the past 7 days
+    Get the list of available achievements, refreshed from Firebase at most once per TTL
     """
-    try:
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=7)
-        
-        sessions = await firebase_service.get_user_sessions_by_date_range(user_id, start_date, end_date)
-        
-        weekly_progress = {}
-        for i in range(7):
-            date_key = (end_date - timedelta(days=i)).strftime("%Y-%m-%d")
-            weekly_progress[date_key] = 0
-        
-        for session in sessions:
-            session_date = session.get("timestamp", "").split("T")[0]
-            if session_date in weekly_progress:
-                weekly_progress[session_date] += session.get("points_earned", 0)
-        
-        return weekly_progress
+    global _AVAILABLE_ACHIEVEMENTS_CACHE
+    
+    cached = _AVAILABLE_ACHIEVEMENTS_CACHE
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    
+    async with _AVAILABLE_ACHIEVEMENTS_LOCK:
+        cached = _AVAILABLE_ACHIEVEMENTS_CACHE
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
         
-    except Exception as e:
-        logger.error(f"Error calculating weekly progress: {str(e)}")
-        return {}
+        achievements = await firebase_service.get_available_achievements()
+        ttl = _AVAILABLE_ACHIEVEMENTS_TTL_SECONDS if achievements else _AVAILABLE_ACHIEVEMENTS_EMPTY_TTL_SECONDS
+        _AVAILABLE_ACHIEVEMENTS_CACHE = (time.monotonic() + ttl, achievements)
+        return achievements
+
+async def get_cached_leaderboard(period: str, limit: int) -> tuple:
+    """
+    Get leaderboard rankings and participant count, refreshed at most once per TTL
+    """
+    key = (period, limit)
+    cached = _LEADERBOARD_CACHE.get(key)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    
+    async with _LEADERBOARD_LOCK:
+        # Another request may have refreshed the entry while we waited
+        cached = _LEADERBOARD_CACHE.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        
+        payload = await asyncio.gather(
+            firebase_service.get_leaderboard(period, limit),
+            firebase_service.get_total_participants(period)
+        )
+        payload = tuple(payload)
+        # An empty ranking may be a failed read; don't pin it for the whole TTL
+        if payload[0]:
+            expires_at = time.monotonic() + _LEADERBOARD_TTL_SECONDS + random.uniform(*_LEADERBOARD_JITTER_SECONDS)
+            _LEADERBOARD_CACHE[key] = (expires_at, payload)
+        return payload
+
+async def get_cached_user_progress(user_id: str) -> Optional[Dict]:
+    """
+    Get user progress, reusing a read from the last few seconds
+    """
+    cached = _PROGRESS_CACHE.get(user_id)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    
+    progress_data = await firebase_service.get_user_progress(user_id)
+    if progress_data:
+        if len(_PROGRESS_CACHE) >= _PROGRESS_CACHE_MAX_ENTRIES:
+            # Drop expired entries so the cache only holds recently active users
+            now = time.monotonic()
+            for key in [key for key, (expires_at, _) in _PROGRESS_CACHE.items() if expires_at <= now]:
+                del _PROGRESS_CACHE[key]
+        _PROGRESS_CACHE[user_id] = (time.monotonic() + _PROGRESS_CACHE_TTL_SECONDS, progress_data)
+    return progress_data
+
+def invalidate_cached_user_progress(user_id: str):
+    """Drop the cached progress after a write so the next read is fresh"""
+    _PROGRESS_CACHE.pop(user_id, None)
+
+async def _none():
+    """Placeholder awaitable for optional calls inside asyncio.gather"""
+    return None
+
+def recent_weekly_progress(daily_points: Dict[str, int]) -> Dict[str, int]:
+    """
+    Get points per day for the past 7 days from the stored daily aggregate
+    """
+    today = datetime.utcnow().date()
+    days = [(today - timedelta(days=i)).isoformat() for i in range(7)]
+    
+    # Nothing recorded yet: every day is zero
+    if not daily_points:
+        return dict.fromkeys(days, 0)
+    
+    return {day: daily_points.get(day, 0) for day in days}
+
+def _session_day(timestamp: Any) -> Optional[str]:
+    """
+    UTC date key (YYYY-MM-DD) of a session timestamp stored as a datetime or ISO string
+    """
+    if isinstance(timestamp, datetime):
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone(timezone.utc)
+        return timestamp.date().isoformat()
+    if isinstance(timestamp, str) and timestamp:
+        return timestamp.split("T")[0]
+    return None
+
+async def ensure_weekly_progress(user_id: str, progress_data: Dict) -> Dict[str, int]:
+    """
+    Get the stored daily points map; progress documents written before it existed
+    are rebuilt once from the last 7 days of sessions and backfilled
+    """
+    if "weekly_progress" in progress_data:
+        return progress_data["weekly_progress"]
+    
+    sessions = await firebase_service.get_user_sessions(
+        user_id, limit=None, days=7, fields=WEEKLY_SESSION_FIELDS
+    )
+    cutoff_key = (datetime.utcnow().date() - timedelta(days=6)).isoformat()
+    daily_points: Dict[str, int] = {}
+    for session in sessions:
+        day = _session_day(session.get("timestamp"))
+        if day and day >= cutoff_key:
+            daily_points[day] = daily_points.get(day, 0) + (session.get("points_earned") or 0)
+    
+    if await firebase_service.apply_progress_update(user_id, {}, {"weekly_progress": daily_points}):
+        invalidate_cached_user_progress(user_id)
+    progress_data["weekly_progress"] = daily_points
+    return daily_points
 
 def calculate_progress_update(current_progress: Dict, request: ProgressUpdateRequest) -> Dict:
     """
@@ -246,26 +438,36 @@ def calculate_progress_update(current_progress: Dict, request: ProgressUpdateReq
     # Update total sessions
     updated_progress["total_sessions"] = current_progress.get("total_sessions", 0) + 1
     
-    # Update average accuracy
+    # Update accuracy running sum and count (average is derived on read)
     if request.accuracy_score is not None:
-        current_avg = current_progress.get("average_accuracy", 0.0)
-        current_sessions = current_progress.get("total_sessions", 0)
-        
-        if current_sessions > 0:
-            new_avg = ((current_avg * current_sessions) + request.accuracy_score) / (current_sessions + 1)
+        if "accuracy_count" in current_progress:
+            accuracy_sum = current_progress.get("accuracy_sum", 0.0)
+            accuracy_count = current_progress["accuracy_count"]
         else:
-            new_avg = request.accuracy_score
+            # Seed from the legacy average, which was taken over all sessions
+            accuracy_count = current_progress.get("total_sessions", 0)
+            accuracy_sum = current_progress.get("average_accuracy", 0.0) * accuracy_count
         
-        updated_progress["average_accuracy"] = new_avg
+        updated_progress["accuracy_sum"] = accuracy_sum + request.accuracy_score
+        updated_progress["accuracy_count"] = accuracy_count + 1
+        updated_progress["average_accuracy"] = get_average_accuracy(updated_progress)
     
     # Update activity frequency
-    activity_freq = current_progress.get("activity_frequency", {})
+    activity_freq = dict(current_progress.get("activity_frequency", {}))
     activity_freq[request.activity_type] = activity_freq.get(request.activity_type, 0) + 1
     updated_progress["activity_frequency"] = activity_freq
     
-    # Update favorite activity
-    most_frequent_activity = max(activity_freq.items(), key=lambda x: x[1])[0]
-    updated_progress["favorite_activity"] = most_frequent_activity
+    # Update favorite activity incrementally from the stored favorite count
+    activity_count = activity_freq[request.activity_type]
+    favorite_activity = current_progress.get("favorite_activity")
+    favorite_count = current_progress.get(
+        "favorite_activity_count", activity_freq.get(favorite_activity, 0)
+    )
+    if activity_count > favorite_count or request.activity_type == favorite_activity:
+        favorite_activity = request.activity_type
+        favorite_count = activity_count
+    updated_progress["favorite_activity"] = favorite_activity
+    updated_progress["favorite_activity_count"] = favorite_count
     
     # Update streak
     last_session_date = current_progress.get("last_session_date")
@@ -285,11 +487,53 @@ def calculate_progress_update(current_progress: Dict, request: ProgressUpdateReq
     else:
         updated_progress["current_streak"] = 1
     
+    # Update daily points aggregate, keeping only the past 7 days
+    today_key = today.isoformat()
+    cutoff_key = (today - timedelta(days=6)).isoformat()
+    daily_points = current_progress.get("weekly_progress", {})
+    daily_points = {day: points for day, points in daily_points.items() if day >= cutoff_key}
+    daily_points[today_key] = daily_points.get(today_key, 0) + request.points_earned
+    updated_progress["weekly_progress"] = daily_points
+    
     updated_progress["last_session_date"] = today.isoformat()
     updated_progress["last_updated"] = datetime.utcnow().isoformat()
     
     return updated_progress
 
+def build_progress_write(current_progress: Dict, updated_progress: Dict,
+                         request: ProgressUpdateRequest) -> tuple:
+    """
+    Split a progress update into atomic increments, plain field updates and
+    deleted keys, so counters don't depend on the value that was read
+    """
+    today_key = updated_progress["last_session_date"]
+    increments = {
+        "total_points": request.points_earned,
+        "total_sessions": 1,
+        f"activity_frequency.{request.activity_type}": 1,
+        f"weekly_progress.{today_key}": request.points_earned
+    }
+    
+    updates = {field: updated_progress[field] for field in PROGRESS_SET_FIELDS if field in updated_progress}
+    
+    if request.accuracy_score is not None:
+        if "accuracy_count" in current_progress:
+            increments["accuracy_sum"] = request.accuracy_score
+            increments["accuracy_count"] = 1
+        else:
+            # First write after migrating from the legacy average
+            updates["accuracy_sum"] = updated_progress["accuracy_sum"]
+            updates["accuracy_count"] = updated_progress["accuracy_count"]
+    
+    # Days that fell out of the 7-day window
+    weekly_progress = updated_progress.get("weekly_progress", {})
+    deletes = [
+        f"weekly_progress.{day}" for day in current_progress.get("weekly_progress", {})
+        if day not in weekly_progress
+    ]
+    
+    return increments, updates, deletes
+
 def check_level_up(progress_data: Dict) -> Dict:
     """
     Check if user has leveled up
@@ -297,77 +541,62 @@ def check_level_up(progress_data: Dict) -> Dict:
     current_level = progress_data.get("current_level", 1)
     total_points = progress_data.get("total_points", 0)
     
-    # Level calculation: Level 1 = 0-99 points, Level 2 = 100-299 points, etc.
-    required_points_for_current_level = (current_level - 1) * 100 + (current_level - 1) * 50
-    required_points_for_next_level = current_level * 100 + current_level * 50
+    # Level calculation: Level 1 = 0-149 points, Level 2 = 150-299 points, etc.
+    # A large session can cross several boundaries at once
+    new_level = bisect_right(LEVEL_POINT_BOUNDARIES, total_points)
     
-    if total_points >= required_points_for_next_level:
-        progress_data["current_level"] = current_level + 1
-        return {"level_up": True, "new_level": current_level + 1}
+    if new_level > current_level:
+        progress_data["current_level"] = new_level
+        return {"level_up": True, "new_level": new_level}
     
     return {"level_up": False}
 
+def _reached_thresholds(thresholds: List[tuple], value: float) -> List[str]:
+    """
+    Get achievement IDs whose threshold is at or below value
+    """
+    index = bisect_right([threshold for threshold, _ in thresholds], value)
+    return [achievement_id for _, achievement_id in thresholds[:index]]
+
 async def check_new_achievements(user_id: str, progress_data: Dict, session_data: ProgressUpdateRequest) -> List[Dict]:
     """
     Check for new achievements earned
     """
+    # Earned IDs are kept on the progress document; older documents fall back to Firebase
+    earned_achievement_ids = progress_data.get("earned_achievement_ids")
+    if earned_achievement_ids is None:
+        current_achievements = await firebase_service.get_user_achievements(user_id)
+        earned_achievement_ids = [ach["id"] for ach in current_achievements]
+    
+    # Only evaluate the triggers relevant to this update
+    candidate_ids = []
+    if session_data.activity_type in ACTIVITY_FIRSTS:
+        candidate_ids.append(ACTIVITY_FIRSTS[session_data.activity_type])
+    if session_data.accuracy_score:
+        candidate_ids += _reached_thresholds(ACCURACY_THRESHOLDS, session_data.accuracy_score)
+    candidate_ids += _reached_thresholds(POINT_THRESHOLDS, progress_data.get("total_points", 0))
+    candidate_ids += _reached_thresholds(STREAK_THRESHOLDS, progress_data.get("current_streak", 0))
+    candidate_ids += _reached_thresholds(LEVEL_ACHIEVEMENT_THRESHOLDS, progress_data.get("current_level", 1))
+    
+    earned = set(earned_achievement_ids)
     new_achievements = []
-    current_achievements = await firebase_service.get_user_achievements(user_id)
-    earned_achievement_ids = [ach["id"] for ach in current_achievements]
-    
-    # Define achievement criteria
-    achievements_criteria = [
-        {
-            "id": "first_speech",
-            "name": "Pembicara Pertama",
-            "description": "Menyelesaikan latihan bicara pertama",
-            "icon": "🎤",
-            "criteria": lambda p, s: s.activity_type == "speech_training"
-        },
-        {
-            "id": "accuracy_master",
-            "name": "Master Akurasi",
-            "description": "Mencapai akurasi 95% atau lebih",
-            "icon": "🎯",
-            "criteria": lambda p, s: s.accuracy_score and s.accuracy_score >= 95
-        },
-        {
-            "id": "point_collector",
-            "name": "Kolektor Poin",
-            "description": "Mengumpulkan 1000 poin",
-            "icon": "💎",
-            "criteria": lambda p, s: p.get("total_points", 0) >= 1000
-        },
-        {
-            "id": "streak_warrior",
-            "name": "Pejuang Konsisten",
-            "description": "Belajar 7 hari berturut-turut",
-            "icon": "🔥",
-            "criteria": lambda p, s: p.get("current_streak", 0) >= 7
-        },
-        {
-            "id": "level_5",
-            "name": "Penjelajah Level 5",
-            "description": "Mencapai Level 5",
-            "icon": "⭐",
-            "criteria": lambda p, s: p.get("current_level", 1) >= 5
-        }
-    ]
-    
-    for achievement in achievements_criteria:
-        if achievement["id"] not in earned_achievement_ids:
-            if achievement["criteria"](progress_data, session_data):
-                new_achievement = {
-                    "id": achievement["id"],
-                    "name": achievement["name"],
-                    "description": achievement["description"],
-                    "icon": achievement["icon"],
-                    "earned_date": datetime.utcnow().isoformat()
-                }
-                new_achievements.append(new_achievement)
-                
-                # Save achievement to Firebase
-                await firebase_service.save_user_achievement(user_id, new_achievement)
+    for achievement_id in candidate_ids:
+        if achievement_id not in earned:
+            earned.add(achievement_id)
+            new_achievements.append({
+                "id": achievement_id,
+                **ACHIEVEMENT_DEFINITIONS[achievement_id],
+                "earned_date": datetime.utcnow().isoformat()
+            })
+    
+    progress_data["earned_achievement_ids"] = list(earned_achievement_ids) + [ach["id"] for ach in new_achievements]
+    
+    # Save achievements to Firebase
+    if new_achievements:
+        await asyncio.gather(*(
+            firebase_service.save_user_achievement(user_id, achievement)
+            for achievement in new_achievements
+        ))
     
     return new_achievements
 
@@ -386,28 +615,54 @@ def calculate_user_statistics(sessions_data: List[Dict]) -> Dict:
         }
     
     total_sessions = len(sessions_data)
-    total_time = sum(session.get("completion_time", 0) for session in sessions_data)
-    accuracies = [s.get("accuracy_score", 0) for s in sessions_data if s.get("accuracy_score")]
-    average_accuracy = sum(accuracies) / len(accuracies) if accuracies else 0
+    total_time = 0
+    total_points = 0
+    accuracy_sum = 0
+    accuracy_count = 0
+    activity_counts = Counter()
     
-    # Count activity types
-    activity_counts = {}
+    # Accumulate everything in a single pass over the sessions
     for session in sessions_data:
-        activity = session.get("activity_type", "unknown")
-        activity_counts[activity] = activity_counts.get(activity, 0) + 1
+        total_time += session.get("completion_time", 0)
+        total_points += session.get("points_earned", 0)
+        accuracy = session.get("accuracy_score")
+        if accuracy:
+            accuracy_sum += accuracy
+            accuracy_count += 1
+        activity_counts[session.get("activity_type", "unknown")] += 1
     
-    favorite_activity = max(activity_counts.items(), key=lambda x: x[1])[0] if activity_counts else "speech_training"
-    total_points = sum(session.get("points_earned", 0) for session in sessions_data)
+    average_accuracy = accuracy_sum / accuracy_count if accuracy_count else 0
+    favorite_activity = activity_counts.most_common(1)[0][0]
     
     return {
         "total_sessions": total_sessions,
         "total_time_spent": total_time,
         "average_accuracy": average_accuracy,
         "favorite_activity": favorite_activity,
-        "activity_breakdown": activity_counts,
+        "activity_breakdown": dict(activity_counts),
         "total_points": total_points
     }
 
+def apply_session_totals(stats: Dict, totals: Dict) -> Dict:
+    """
+    Replace the sample-based totals in stats with aggregated totals over all sessions
+    Sessions of activity types missing from the sample are counted as "other"
+    """
+    breakdown = dict(totals["activity_breakdown"])
+    uncounted = totals["total_sessions"] - sum(breakdown.values())
+    if uncounted > 0:
+        breakdown["other"] = breakdown.get("other", 0) + uncounted
+    
+    stats.update(
+        total_sessions=totals["total_sessions"],
+        total_points=totals["total_points"],
+        total_time_spent=totals["total_time_spent"],
+        activity_breakdown=breakdown
+    )
+    if breakdown:
+        stats["favorite_activity"] = Counter(breakdown).most_common(1)[0][0]
+    return stats
+
 def generate_learning_insights(stats: Dict, sessions_data: List[Dict]) -> List[str]:
     """
     Generate learning insights based on user statistics
@@ -463,22 +718,23 @@ def calculate_performance_trends(sessions_data: List[Dict]) -> Dict[str, List[fl
     if not sessions_data:
         return {}
     
-    # Sort sessions by timestamp
-    sorted_sessions = sorted(sessions_data, key=lambda x: x.get("timestamp", ""))
+    count = len(sessions_data)
     
-    accuracy_trend = []
-    points_trend = []
-    time_trend = []
+    # Stable sort by timestamp, then gather every column with the same order
+    timestamps = np.empty(count, dtype=object)
+    timestamps[:] = [session.get("timestamp", "") for session in sessions_data]
+    order = np.argsort(timestamps, kind="stable")
     
-    for session in sorted_sessions:
-        if session.get("accuracy_score"):
-            accuracy_trend.append(session["accuracy_score"])
-        
-        points_trend.append(session.get("points_earned", 0))
-        time_trend.append(session.get("completion_time", 0))
+    # Stride-sample long windows so each trend stays at most TREND_MAX_POINTS long
+    if count > TREND_MAX_POINTS:
+        order = order[::-(-count // TREND_MAX_POINTS)]
+    
+    accuracy = np.fromiter((session.get("accuracy_score") or 0 for session in sessions_data), dtype=np.float64, count=count)[order]
+    points = np.fromiter((session.get("points_earned", 0) for session in sessions_data), dtype=np.float64, count=count)[order]
+    completion_time = np.fromiter((session.get("completion_time", 0) for session in sessions_data), dtype=np.float64, count=count)[order]
     
     return {
-        "accuracy_trend": accuracy_trend,
-        "points_trend": points_trend,
-        "completion_time_trend": time_trend
+        "accuracy_trend": accuracy[accuracy != 0].tolist(),
+        "points_trend": points.tolist(),
+        "completion_time_trend": completion_time.tolist()
     }
@@ -1,23 +1,27 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException, Depends
+from fastapi import APIRouter, File, UploadFile, HTTPException, Depends, WebSocket
+from starlette.websockets import WebSocketState
 from fastapi.responses import FileResponse
-import aiofiles
-import os
-from typing import Dict, Any
+import asyncio
+import io
+import random
+from typing import Dict, Any, BinaryIO
 from pydantic import BaseModel
 import logging
+from rapidfuzz import fuzz
 
 from services.google_cloud import google_cloud_service
 from services.firebase import firebase_service
-from utils.helpers import validate_audio_file, generate_unique_filename
-from ai_models.speech_model import SpeechRecognitionModel, quick_speech_analysis
-from ai_models.adaptive_learning import AdaptiveLearningModel, create_default_user_profile
+from utils.helpers import validate_audio_file
+from ai_models.speech_model import quick_speech_analysis
+from ai_models.adaptive_learning import create_default_user_profile
+from ai_models.registry import model_registry
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Initialize AI models
-speech_model = SpeechRecognitionModel()
-adaptive_learning = AdaptiveLearningModel()
+# Shared AI models
+speech_model = model_registry.speech_model
+adaptive_learning = model_registry.adaptive_model
 
 # Pydantic models for request/response
 class SpeechToTextRequest(BaseModel):
@@ -62,20 +66,13 @@ async def speech_to_text(
         if not validate_audio_file(audio_file):
             raise HTTPException(status_code=400, detail="Invalid audio file format")
         
-        # Save uploaded audio temporarily
-        temp_filename = generate_unique_filename(audio_file.filename)
-        temp_path = os.path.join(os.getcwd(), "tmp", temp_filename)
+        # Keep the upload in memory and send it straight to Google Cloud
+        content = await audio_file.read()
         
-        # Ensure tmp directory exists
-        os.makedirs(os.path.dirname(temp_path), exist_ok=True)
-        
-        async with aiofiles.open(temp_path, 'wb') as f:
-            content = await audio_file.read()
-            await f.write(content)
-        
-        # Process speech-to-text with Google Cloud
-        recognition_result = google_cloud_service.speech_to_text(
-            audio_path=temp_path,
+        # Process speech-to-text with Google Cloud (blocking SDK call, run in a thread)
+        stt_task = asyncio.to_thread(
+            google_cloud_service.speech_to_text,
+            audio_bytes=content,
             language_code="id-ID"  # Indonesian
         )
         
@@ -85,18 +82,24 @@ async def speech_to_text(
         points_awarded = 0
         
         if request_data.expected_text:
+            # Pronunciation analysis only needs the audio, so overlap it with STT
+            recognition_result, pronunciation_score = await asyncio.gather(
+                stt_task,
+                analyze_pronunciation(
+                    audio=io.BytesIO(content),
+                    expected_text=request_data.expected_text
+                )
+            )
+            
             accuracy_score = calculate_text_accuracy(
                 expected=request_data.expected_text,
                 actual=recognition_result["text"]
             )
             
-            pronunciation_score = await analyze_pronunciation(
-                audio_path=temp_path,
-                expected_text=request_data.expected_text
-            )
-            
             # Award points based on performance
             points_awarded = calculate_points(accuracy_score, pronunciation_score)
+        else:
+            recognition_result = await stt_task
         
         # Generate feedback message
         feedback = generate_feedback(accuracy_score, pronunciation_score)
@@ -111,10 +114,6 @@ async def speech_to_text(
             points_awarded=points_awarded
         )
         
-        # Clean up temporary file
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
-        
         return SpeechToTextResponse(
             recognized_text=recognition_result["text"],
             confidence=recognition_result["confidence"],
@@ -125,41 +124,56 @@ async def speech_to_text(
         )
         
     except Exception as e:
-        # Clean up on error
-        if 'temp_path' in locals() and os.path.exists(temp_path):
-            os.remove(temp_path)
         raise HTTPException(status_code=500, detail=f"Speech processing failed: {str(e)}")
 
+@router.websocket("/stt/stream")
+async def speech_to_text_stream(websocket: WebSocket, language_code: str = "id-ID"):
+    """
+    Stream audio over a WebSocket and receive transcripts as they are recognized
+    Send binary audio chunks, then the text message "end" (or close) to finish
+    """
+    await websocket.accept()
+    
+    async def audio_chunks():
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect" or message.get("text") == "end":
+                return
+            if message.get("bytes"):
+                yield message["bytes"]
+    
+    async for transcript in google_cloud_service.streaming_speech_to_text(audio_chunks(), language_code):
+        if websocket.client_state != WebSocketState.CONNECTED:
+            break
+        await websocket.send_json(transcript)
+    
+    if websocket.client_state == WebSocketState.CONNECTED:
+        await websocket.close()
+
 @router.post("/tts")
 async def text_to_speech(request: TextToSpeechRequest):
     """
     Convert text to speech audio file
     """
     try:
-        # Generate speech audio using Google Cloud TTS
-        audio_content = google_cloud_service.text_to_speech(
+        # Generate (or reuse cached) speech audio with Google Cloud TTS (blocking SDK call, run in a thread)
+        audio_path = await asyncio.to_thread(
+            google_cloud_service.text_to_speech_file,
             text=request.text,
             voice_name=request.voice_name,
-            speed=request.speed,
-            pitch=request.pitch
+            speed=request.speed
         )
         
-        # Save audio to temporary file
-        temp_filename = f"tts_{generate_unique_filename('audio.mp3')}"
-        temp_path = os.path.join(os.getcwd(), "tmp", temp_filename)
-        
-        # Ensure tmp directory exists
-        os.makedirs(os.path.dirname(temp_path), exist_ok=True)
-        
-        async with aiofiles.open(temp_path, 'wb') as f:
-            await f.write(audio_content)
+        if audio_path is None:
+            raise HTTPException(status_code=503, detail="Text-to-speech service unavailable")
         
         # Return audio file
+        audio_filename = f"tts_{audio_path.name}"
         return FileResponse(
-            path=temp_path,
+            path=audio_path,
             media_type="audio/mpeg",
-            filename=temp_filename,
-            headers={"Content-Disposition": f"attachment; filename={temp_filename}"}
+            filename=audio_filename,
+            headers={"Content-Disposition": f"attachment; filename={audio_filename}"}
         )
         
     except Exception as e:
@@ -177,19 +191,8 @@ async def analyze_pronunciation_detailed(
         if not expected_text:
             raise HTTPException(status_code=400, detail="Expected text is required for analysis")
         
-        # Save uploaded audio temporarily
-        temp_filename = generate_unique_filename(audio_file.filename)
-        temp_path = os.path.join(os.getcwd(), "tmp", temp_filename)
-        
-        # Ensure tmp directory exists
-        os.makedirs(os.path.dirname(temp_path), exist_ok=True)
-        
-        async with aiofiles.open(temp_path, 'wb') as f:
-            content = await audio_file.read()
-            await f.write(content)
-        
         # Perform basic pronunciation analysis
-        # TODO: Implement detailed pronunciation analysis
+        # TODO: Implement detailed pronunciation analysis (read audio_file here once it uses the audio)
         analysis_result = {
             "similarity_score": 0.85,
             "pronunciation_feedback": "Good pronunciation!",
@@ -197,28 +200,20 @@ async def analyze_pronunciation_detailed(
             "overall_score": 85
         }
         
-        # Clean up
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
-        
         return PronunciationAnalysisResponse(**analysis_result)
         
     except Exception as e:
-        if 'temp_path' in locals() and os.path.exists(temp_path):
-            os.remove(temp_path)
         raise HTTPException(status_code=500, detail=f"Pronunciation analysis failed: {str(e)}")
 
 # Helper functions
 def calculate_text_accuracy(expected: str, actual: str) -> float:
     """Calculate text similarity/accuracy percentage"""
-    from difflib import SequenceMatcher
-    return SequenceMatcher(None, expected.lower(), actual.lower()).ratio() * 100
+    return fuzz.ratio(expected.lower(), actual.lower())
 
-async def analyze_pronunciation(audio_path: str, expected_text: str) -> float:
+async def analyze_pronunciation(audio: BinaryIO, expected_text: str) -> float:
     """Analyze pronunciation quality (placeholder for ML model)"""
     # TODO: Implement actual pronunciation analysis using ML model
     # For now, return a simulated score
-    import random
     return random.uniform(70.0, 95.0)
 
 def calculate_points(accuracy_score: float = None, pronunciation_score: float = None) -> int:
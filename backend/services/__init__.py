@@ -1,4 +1,4 @@
 from .google_cloud import google_cloud_service
-from .firebase import firebase_service
+from .firebase import firebase_service, get_firebase
 
-__all__ = ['google_cloud_service', 'firebase_service']
+__all__ = ['google_cloud_service', 'firebase_service', 'get_firebase']
@@ -1,29 +1,99 @@
 import os
-import json
+import io
+import asyncio
 import logging
+import orjson
+import numpy as np
+from itertools import cycle
+from functools import lru_cache
+from cachetools import TTLCache
+from datetime import datetime, timedelta, timezone
 import firebase_admin
 from firebase_admin import credentials, firestore, auth, storage
-from typing import Optional, Dict, Any, List
+from google.cloud.firestore_v1.field_path import FieldPath
+from typing import Optional, Dict, Any, List, Tuple
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
 
 logger = logging.getLogger(__name__)
 
-class FirebaseService:
+# User profile cache: in-process L1 in front of an optional shared Redis L2
+PROFILE_L1_MAX_ENTRIES = 10_000
+PROFILE_L1_TTL_SECONDS = 30
+PROFILE_L2_TTL_SECONDS = 300
+
+# Timestamps in Redis-cached profiles are stored as {"$datetime": ISO 8601} and parsed back on read
+_DATETIME_TAG = "$datetime"
+
+def _encode_cached_value(value):
+    """orjson default for cached profiles; other non-JSON types raise so the profile isn't cached"""
+    if isinstance(value, datetime):
+        return {_DATETIME_TAG: value.isoformat()}
+    raise TypeError(f"Type is not cacheable: {type(value).__name__}")
+
+def _decode_cached_value(value):
+    """Restore datetimes written by _encode_cached_value"""
+    if isinstance(value, dict):
+        if len(value) == 1 and _DATETIME_TAG in value:
+            return datetime.fromisoformat(value[_DATETIME_TAG])
+        return {key: _decode_cached_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode_cached_value(item) for item in value]
+    return value
+
+# Firestore operations are spread round-robin over several clients, each opening
+# its own gRPC channel, so concurrent RPCs don't queue on one HTTP/2 stream budget
+# (pool size comes from FIRESTORE_CHANNEL_POOL_SIZE, read in startup())
+DEFAULT_FIRESTORE_POOL_SIZE = 4
+
+# Speech session writes are coalesced into small batched commits
+SESSION_BATCH_SIZE = 10  # Small batches keep write contention low
+SESSION_FLUSH_SECONDS = 0.05  # Longest a queued session waits for its batch
+
+# Audio uploads stream in 1 MB chunks (must be a multiple of 256 KB) and are shared via signed URLs
+AUDIO_UPLOAD_CHUNK_SIZE = 1024 * 1024
+AUDIO_URL_EXPIRATION = timedelta(hours=1)
+
+# Recent sessions fetched for the analytics trend and strong/weak areas, reported
+# back as trendSessionCount (totals come from the daily rollups)
+ANALYTICS_TREND_SESSIONS = 20
+
+# Per-user document in daily_stats recording when rollups began ('rollups_since', epoch seconds)
+ROLLUP_META_DOC = 'meta'
+
+# Skill areas scored per session (session['category_scores']) and how many to report each way
+AREA_CATEGORIES = ("pronunciation", "rhythm", "clarity", "confidence")
+AREAS_REPORTED = 2
+
+class AsyncFirebaseService:
     """
     Firebase service for authentication, Firestore, and storage operations
+    Firestore is accessed through the async client; call startup() from the
+    running event loop before serving requests
     """
     
     def __init__(self):
         self.app = None
-        self.db = None
-        self.bucket = None
-        self._initialize_firebase()
+        self.redis = None
+        self._db_pool: List[firestore.AsyncClient] = []
+        self._db_cycle = None
+        self.profile_cache = TTLCache(maxsize=PROFILE_L1_MAX_ENTRIES, ttl=PROFILE_L1_TTL_SECONDS)
+        self._session_queue: Optional[asyncio.Queue] = None
+        self._session_flush_task: Optional[asyncio.Task] = None
+        self._bucket = None
     
     def _initialize_firebase(self):
         """
-        Initialize Firebase Admin SDK
+        Initialize Firebase Admin SDK (from startup(), not at import)
         """
         try:
-            if not firebase_admin._apps:
+            if firebase_admin._apps:
+                # Reuse the app another component already initialized
+                self.app = firebase_admin.get_app()
+            else:
                 # Load service account credentials
                 service_account_path = os.getenv('FIREBASE_SERVICE_ACCOUNT_PATH')
                 
@@ -34,7 +104,7 @@ class FirebaseService:
                     # Load from environment variable (JSON string)
                     service_account_info = os.getenv('FIREBASE_SERVICE_ACCOUNT_JSON')
                     if service_account_info:
-                        service_account_dict = json.loads(service_account_info)
+                        service_account_dict = orjson.loads(service_account_info)
                         cred = credentials.Certificate(service_account_dict)
                     else:
                         logger.error("Firebase credentials not found")
@@ -45,44 +115,146 @@ class FirebaseService:
                     'storageBucket': os.getenv('FIREBASE_STORAGE_BUCKET', 'zeko-70d2a.appspot.com')
                 })
                 
-                # Initialize services
-                self.db = firestore.client()
-                self.bucket = storage.bucket()
-                
                 logger.info("Firebase initialized successfully")
-            else:
-                # Use existing app
-                self.app = firebase_admin.get_app()
-                self.db = firestore.client()
-                self.bucket = storage.bucket()
                 
         except Exception as e:
             logger.error(f"Failed to initialize Firebase: {str(e)}")
     
+    @property
+    def bucket(self):
+        """Storage bucket, created on first upload or delete"""
+        if self._bucket is None and self.app:
+            self._bucket = storage.bucket(app=self.app)
+        return self._bucket
+    
+    @property
+    def db(self) -> Optional[firestore.AsyncClient]:
+        """
+        Next async Firestore client from the pool, or None before startup()
+        Each access may return a different client: read it once per operation
+        and build every reference, batch and query of that operation from it
+        """
+        return next(self._db_cycle) if self._db_pool else None
+    
+    def _create_firestore_client(self) -> firestore.AsyncClient:
+        """
+        Create an async Firestore client (opens its own gRPC channel on first use)
+        """
+        return firestore.AsyncClient(
+            project=self.app.project_id,
+            credentials=self.app.credential.get_credential()
+        )
+    
+    async def startup(self):
+        """
+        Initialize Firebase and create the async Firestore clients so their
+        gRPC channels belong to the running event loop
+        """
+        if not self.app:
+            self._initialize_firebase()
+        
+        if self.app and not self._db_pool:
+            try:
+                pool_size = int(os.getenv('FIRESTORE_CHANNEL_POOL_SIZE', str(DEFAULT_FIRESTORE_POOL_SIZE)))
+                self._db_pool = [self._create_firestore_client() for _ in range(max(1, pool_size))]
+                self._db_cycle = cycle(self._db_pool)
+                logger.info(f"Async Firestore client pool ready ({len(self._db_pool)} channels)")
+            except Exception as e:
+                logger.error(f"Failed to create async Firestore clients: {str(e)}")
+        
+        redis_url = os.getenv('REDIS_URL')
+        if redis_url and aioredis and not self.redis:
+            self.redis = aioredis.Redis.from_url(redis_url)
+            logger.info("Redis profile cache enabled")
+        
+        if self.db and not self._session_flush_task:
+            self._session_queue = asyncio.Queue()
+            self._session_flush_task = asyncio.create_task(self._session_flush_loop())
+    
+    async def shutdown(self):
+        """
+        Stop the session writer, commit whatever is still queued and close Redis
+        """
+        try:
+            await self._stop_session_writer()
+        finally:
+            if self.redis:
+                try:
+                    await self.redis.aclose()
+                except Exception as e:
+                    logger.warning(f"Error closing Redis: {str(e)}")
+                self.redis = None
+    
+    async def _stop_session_writer(self):
+        """
+        Cancel the session flush task and commit the remaining queue
+        """
+        if not self._session_flush_task:
+            return
+        
+        self._session_flush_task.cancel()
+        try:
+            await self._session_flush_task
+        except asyncio.CancelledError:
+            pass
+        self._session_flush_task = None
+        
+        pending = []
+        while not self._session_queue.empty():
+            pending.append(self._session_queue.get_nowait())
+        for i in range(0, len(pending), SESSION_BATCH_SIZE):
+            await self._commit_sessions(pending[i:i + SESSION_BATCH_SIZE])
+    
     # User Management
-    def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
+    async def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
         """
-        Get user data from Firestore
+        Get user data, checking the in-process and Redis caches before Firestore
         """
         try:
+            user_data = self.profile_cache.get(user_id)
+            if user_data is not None:
+                return user_data
+            
+            cache_key = f"user:{user_id}"
+            if self.redis:
+                try:
+                    cached = await self.redis.get(cache_key)
+                    if cached:
+                        user_data = _decode_cached_value(orjson.loads(cached))
+                        self.profile_cache[user_id] = user_data
+                        return user_data
+                except Exception as e:
+                    logger.warning(f"Redis read failed for {user_id}: {str(e)}")
+            
             doc_ref = self.db.collection('users').document(user_id)
-            doc = doc_ref.get()
+            doc = await doc_ref.get()
             
-            if doc.exists:
-                return doc.to_dict()
-            return None
+            if not doc.exists:
+                return None
+            
+            user_data = doc.to_dict()
+            self.profile_cache[user_id] = user_data
+            if self.redis:
+                try:
+                    payload = orjson.dumps(user_data, default=_encode_cached_value,
+                            option=orjson.OPT_PASSTHROUGH_DATETIME)
+                    await self.redis.set(cache_key, payload, ex=PROFILE_L2_TTL_SECONDS)
+                except Exception as e:
+                    logger.warning(f"Redis write failed for {user_id}: {str(e)}")
+            return user_data
             
         except Exception as e:
             logger.error(f"Error getting user {user_id}: {str(e)}")
             return None
     
-    def create_user_profile(self, user_id: str, user_data: Dict[str, Any]) -> bool:
+    async def create_user_profile(self, user_id: str, user_data: Dict[str, Any]) -> bool:
         """
         Create or update user profile in Firestore
         """
         try:
             doc_ref = self.db.collection('users').document(user_id)
-            doc_ref.set(user_data, merge=True)
+            await doc_ref.set(user_data, merge=True)
+            await self.invalidate_user_cache(user_id)
             logger.info(f"User profile created/updated for {user_id}")
             return True
             
@@ -90,54 +262,187 @@ class FirebaseService:
             logger.error(f"Error creating user profile {user_id}: {str(e)}")
             return False
     
-    def update_user_progress(self, user_id: str, progress_data: Dict[str, Any]) -> bool:
+    async def update_user_progress(self, user_id: str, progress_data: Dict[str, Any]) -> bool:
         """
         Update user learning progress
         """
         try:
             doc_ref = self.db.collection('users').document(user_id)
-            doc_ref.update({
+            await doc_ref.update({
                 'progress': progress_data,
                 'lastActive': firestore.SERVER_TIMESTAMP
             })
+            await self.invalidate_user_cache(user_id)
             return True
             
         except Exception as e:
             logger.error(f"Error updating progress for {user_id}: {str(e)}")
             return False
     
+    async def apply_progress_update(self, user_id: str, increments: Dict[str, float],
+                              updates: Dict[str, Any], deletes: Optional[List[str]] = None) -> bool:
+        """
+        Apply a progress update in a single write: counters use atomic server-side
+        increments, derived fields are set, and stale map entries are removed.
+        Keys are paths relative to the progress map (e.g. "activity_frequency.singing").
+        """
+        try:
+            fields = {'lastActive': firestore.SERVER_TIMESTAMP}
+            for key, amount in increments.items():
+                fields[self._progress_field(key)] = firestore.Increment(amount)
+            for key, value in updates.items():
+                fields[self._progress_field(key)] = value
+            for key in deletes or []:
+                fields[self._progress_field(key)] = firestore.DELETE_FIELD
+            
+            await self.db.collection('users').document(user_id).update(fields)
+            await self.invalidate_user_cache(user_id)
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error applying progress update for {user_id}: {str(e)}")
+            return False
+    
+    async def invalidate_user_cache(self, user_id: str):
+        """
+        Drop a user's cached profile after it has been written
+        """
+        self.profile_cache.pop(user_id, None)
+        if self.redis:
+            try:
+                await self.redis.delete(f"user:{user_id}")
+            except Exception as e:
+                logger.warning(f"Redis invalidation failed for {user_id}: {str(e)}")
+    
+    @staticmethod
+    def _progress_field(key: str) -> str:
+        """Build a quoted Firestore field path under the progress map"""
+        return FieldPath('progress', *key.split('.')).to_api_repr()
+    
     # Speech Training Sessions
-    def save_speech_session(self, user_id: str, session_data: Dict[str, Any]) -> Optional[str]:
+    async def save_speech_session(self, user_id: str, session_data: Dict[str, Any]) -> Optional[str]:
         """
         Save speech training session data
+        The write is queued and committed in a batch; the document ID is assigned up front
         """
         try:
-            doc_ref = self.db.collection('speech_sessions').add({
+            # The ID is assigned up front; the reference is rebuilt on the committing client
+            doc_id = self.db.collection('speech_sessions').document().id
+            # Stamped here rather than with SERVER_TIMESTAMP so the daily rollup
+            # can be keyed on the session's own (UTC) date
+            payload = {
                 'userId': user_id,
-                'timestamp': firestore.SERVER_TIMESTAMP,
-                **session_data
-            })
+                **session_data,
+                'timestamp': datetime.now(timezone.utc)
+            }
+            
+            if self._session_flush_task:
+                self._session_queue.put_nowait((doc_id, payload))
+            else:
+                await self._commit_sessions([(doc_id, payload)])
             
-            session_id = doc_ref[1].id
-            logger.info(f"Speech session saved with ID: {session_id}")
-            return session_id
+            return doc_id
             
         except Exception as e:
             logger.error(f"Error saving speech session: {str(e)}")
             return None
     
-    def get_user_sessions(self, user_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+    async def _session_flush_loop(self):
+        """
+        Drain queued speech sessions and commit them in small batches
+        """
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            pending = [await self._session_queue.get()]
+            deadline = loop.time() + SESSION_FLUSH_SECONDS
+            
+            try:
+                while len(pending) < SESSION_BATCH_SIZE:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        pending.append(await asyncio.wait_for(self._session_queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # Hand the partial batch back so shutdown() commits it
+                for item in pending:
+                    self._session_queue.put_nowait(item)
+                raise
+            
+            await self._commit_sessions(pending)
+    
+    async def _commit_sessions(self, pending: List[tuple]):
         """
-        Get user's recent speech training sessions
+        Commit queued (document ID, payload) pairs in one WriteBatch, together with
+        the per-user daily rollups (users/{uid}/daily_stats/{YYYY-MM-DD}, UTC dates) read by analytics
         """
         try:
-            query = (self.db.collection('speech_sessions')
-                    .where('userId', '==', user_id)
-                    .order_by('timestamp', direction=firestore.Query.DESCENDING)
-                    .limit(limit))
+            db = self.db
+            batch = db.batch()
+            sessions = db.collection('speech_sessions')
+            rollups: Dict[Tuple[str, str], Dict[str, float]] = {}
+            first_session_at: Dict[str, float] = {}
+            for doc_id, payload in pending:
+                batch.set(sessions.document(doc_id), payload)
+                session_time = payload['timestamp'].astimezone(timezone.utc)
+                user_id = payload['userId']
+                rollup = rollups.setdefault((user_id, session_time.date().isoformat()),
+                        {'count': 0, 'score_sum': 0, 'duration_sum': 0})
+                rollup['count'] += 1
+                rollup['score_sum'] += payload.get('score', 0) or 0
+                rollup['duration_sum'] += payload.get('duration', 0) or 0
+                first_session_at[user_id] = min(first_session_at.get(user_id, float('inf')), session_time.timestamp())
+            
+            for (user_id, date_key), rollup in rollups.items():
+                rollup_ref = self._daily_stats(db, user_id).document(date_key)
+                batch.set(rollup_ref, {
+                    'date': date_key,
+                    **{field: firestore.Increment(amount) for field, amount in rollup.items()}
+                }, merge=True)
+            
+            # Earliest session ever rolled up per user; everything after it is in the rollups
+            for user_id, earliest in first_session_at.items():
+                batch.set(self._daily_stats(db, user_id).document(ROLLUP_META_DOC),
+                        {'rollups_since': firestore.Minimum(earliest)}, merge=True)
+            
+            await batch.commit()
+            logger.info(f"Saved {len(pending)} speech sessions")
+            
+        except Exception as e:
+            logger.error(f"Error saving {len(pending)} speech sessions: {str(e)}")
+    
+    @staticmethod
+    def _daily_stats(db, user_id: str):
+        """Per-user daily rollup collection"""
+        return db.collection('users').document(user_id).collection('daily_stats')
+    
+    async def get_user_sessions(self, user_id: str, limit: Optional[int] = 10, days: Optional[int] = None,
+                                start_after: Optional[Dict[str, Any]] = None,
+                                fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Get user's recent speech training sessions, optionally only from the last N days
+        Pass the last session of the previous page as start_after to fetch the next page,
+        and fields to download only those fields of each session; limit=None returns
+        every matching session (use it together with days)
+        """
+        try:
+            # Served by the (userId ASC, timestamp DESC) index in firestore.indexes.json
+            query = self.db.collection('speech_sessions').where('userId', '==', user_id)
+            if days is not None:
+                query = query.where('timestamp', '>=', datetime.now(timezone.utc) - timedelta(days=days))
+            if fields:
+                query = query.select(fields)
+            query = query.order_by('timestamp', direction=firestore.Query.DESCENDING)
+            if start_after:
+                query = query.start_after({'timestamp': start_after['timestamp']})
+            if limit is not None:
+                query = query.limit(limit)
             
             sessions = []
-            for doc in query.stream():
+            async for doc in query.stream():
                 session_data = doc.to_dict()
                 session_data['id'] = doc.id
                 sessions.append(session_data)
@@ -148,37 +453,104 @@ class FirebaseService:
             logger.error(f"Error getting user sessions: {str(e)}")
             return []
     
+    async def get_user_session_totals(self, user_id: str, days: Optional[int] = None,
+                                      activity_types: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Count and sum a user's sessions (optionally from the last N days) with server-side
+        aggregation queries, plus a per-activity session count for each of activity_types
+        """
+        try:
+            query = self.db.collection('speech_sessions').where('userId', '==', user_id)
+            if days is not None:
+                query = query.where('timestamp', '>=', datetime.now(timezone.utc) - timedelta(days=days))
+            
+            async def aggregate(aggregation):
+                results = await aggregation.get()
+                return {result.alias: result.value or 0 for result in results[0]}
+            
+            activity_types = list(activity_types or [])
+            totals, *activity_counts = await asyncio.gather(
+                aggregate(query
+                        .count(alias='total_sessions')
+                        .sum('points_earned', alias='total_points')
+                        .sum('completion_time', alias='total_time_spent')),
+                # Served by the (userId, activity_type, timestamp DESC) index in firestore.indexes.json
+                *(aggregate(query.where('activity_type', '==', activity_type).count(alias='count'))
+                  for activity_type in activity_types)
+            )
+            totals['activity_breakdown'] = {
+                activity_type: counts['count']
+                for activity_type, counts in zip(activity_types, activity_counts) if counts['count']
+            }
+            return totals
+            
+        except Exception as e:
+            logger.error(f"Error aggregating user sessions: {str(e)}")
+            return None
+    
+    # Gamification
+    async def log_point_transactions_bulk(self, transactions: List[Dict[str, Any]]) -> bool:
+        """
+        Write a batch of point transactions in a single Firestore commit
+        """
+        try:
+            db = self.db
+            batch = db.batch()
+            collection = db.collection('point_transactions')
+            
+            for transaction in transactions:
+                batch.set(collection.document(), {
+                    'userId': transaction['user_id'],
+                    'points': transaction['points'],
+                    'reason': transaction['reason'],
+                    'activityType': transaction['activity_type'],
+                    'metadata': transaction.get('metadata') or {},
+                    'timestamp': firestore.SERVER_TIMESTAMP
+                })
+            
+            await batch.commit()
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error logging {len(transactions)} point transactions: {str(e)}")
+            return False
+    
     # Audio Storage
-    def upload_audio(self, audio_data: bytes, filename: str, user_id: str) -> Optional[str]:
+    async def upload_audio(self, audio_data: bytes, filename: str, user_id: str) -> Optional[str]:
         """
-        Upload audio file to Firebase Storage
+        Upload audio file to Firebase Storage and return a time-limited signed URL
         """
         try:
             blob_path = f"audio_recordings/{user_id}/{filename}"
-            blob = self.bucket.blob(blob_path)
+            blob = self.bucket.blob(blob_path, chunk_size=AUDIO_UPLOAD_CHUNK_SIZE)
             
-            blob.upload_from_string(
-                audio_data,
-                content_type='audio/mpeg'
+            # Cloud Storage client is synchronous, so run it off the event loop
+            # if_generation_match=0: create only, no separate existence check
+            await asyncio.to_thread(
+                blob.upload_from_file,
+                io.BytesIO(audio_data),
+                content_type='audio/mpeg',
+                size=len(audio_data),
+                if_generation_match=0
             )
             
-            # Make blob publicly readable (optional, depends on requirements)
-            blob.make_public()
+            # V4 URL signed locally with the service account key, no extra request
+            url = blob.generate_signed_url(version='v4', expiration=AUDIO_URL_EXPIRATION)
             
             logger.info(f"Audio uploaded successfully: {blob_path}")
-            return blob.public_url
+            return url
             
         except Exception as e:
             logger.error(f"Error uploading audio: {str(e)}")
             return None
     
-    def delete_audio(self, file_path: str) -> bool:
+    async def delete_audio(self, file_path: str) -> bool:
         """
         Delete audio file from Firebase Storage
         """
         try:
             blob = self.bucket.blob(file_path)
-            blob.delete()
+            await asyncio.to_thread(blob.delete)
             logger.info(f"Audio deleted: {file_path}")
             return True
             
@@ -187,40 +559,73 @@ class FirebaseService:
             return False
     
     # Analytics and Reporting
-    def get_user_analytics(self, user_id: str, days: int = 30) -> Dict[str, Any]:
+    async def get_user_analytics(self, user_id: str, days: int = 30) -> Dict[str, Any]:
         """
         Get user analytics for specified period
         """
         try:
-            from datetime import datetime, timedelta
+            # Whole UTC days, matching the daily rollup buckets
+            end_date = datetime.now(timezone.utc)
+            start_date = (end_date - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
             
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days)
+            db = self.db
             
             # Get sessions in date range
-            query = (self.db.collection('speech_sessions')
+            query = (db.collection('speech_sessions')
                     .where('userId', '==', user_id)
                     .where('timestamp', '>=', start_date)
                     .where('timestamp', '<=', end_date))
             
-            sessions = []
-            total_score = 0
-            total_duration = 0
+            # Totals come from the daily rollups (at most one document per day);
+            # only the most recent sessions are downloaded
+            daily_stats = self._daily_stats(db, user_id)
+            rollup_query = (daily_stats
+                    .where('date', '>=', start_date.date().isoformat())
+                    .where('date', '<=', end_date.date().isoformat())
+                    .order_by('date'))
+            recent_query = (query
+                    .select(['score', 'duration', 'timestamp', 'category_scores'])
+                    .order_by('timestamp', direction=firestore.Query.DESCENDING)
+                    .limit(ANALYTICS_TREND_SESSIONS))
+            
+            async def fetch_rollups():
+                return [doc.to_dict() async for doc in rollup_query.stream()]
+            
+            async def fetch_recent():
+                return [doc.to_dict() async for doc in recent_query.stream()]
+            
+            rollups, sessions, meta = await asyncio.gather(
+                fetch_rollups(), fetch_recent(), daily_stats.document(ROLLUP_META_DOC).get())
+            totals = {
+                'count': sum(r.get('count', 0) for r in rollups),
+                'total_score': sum(r.get('score_sum', 0) for r in rollups),
+                'total_duration': sum(r.get('duration_sum', 0) for r in rollups)
+            }
             
-            for doc in query.stream():
-                session = doc.to_dict()
-                sessions.append(session)
-                total_score += session.get('score', 0)
-                total_duration += session.get('duration', 0)
+            # Sessions saved before this user's rollups began are aggregated
+            # server-side; once the window starts after that point nothing is left to add
+            rollups_since = (meta.to_dict() or {}).get('rollups_since') if meta.exists else None
+            rollup_start = datetime.fromtimestamp(rollups_since, timezone.utc) if rollups_since is not None else None
+            if rollup_start is None or rollup_start > start_date:
+                legacy_query = query if rollup_start is None else query.where('timestamp', '<', rollup_start)
+                aggregation = (legacy_query
+                        .count(alias='count')
+                        .sum('score', alias='total_score')
+                        .sum('duration', alias='total_duration'))
+                aggregate_results = await aggregation.get()
+                for result in aggregate_results[0]:
+                    totals[result.alias] += result.value or 0
+            session_count = totals.get('count') or 0
             
             analytics = {
-                'totalSessions': len(sessions),
-                'averageScore': total_score / len(sessions) if sessions else 0,
-                'totalDuration': total_duration,
-                'progressTrend': self._calculate_progress_trend(sessions),
-                'strongAreas': self._identify_strong_areas(sessions),
-                'improvementAreas': self._identify_improvement_areas(sessions)
+                'totalSessions': session_count,
+                'averageScore': (totals.get('total_score') or 0) / session_count if session_count else 0,
+                'totalDuration': totals.get('total_duration') or 0,
+                # Trend and areas are based on the most recent sessions only
+                'progressTrend': self._calculate_progress_trend(sessions, sessions_are_sorted_desc=True),
+                'trendSessionCount': len(sessions),
             }
+            analytics['strongAreas'], analytics['improvementAreas'] = self._identify_areas(sessions)
             
             return analytics
             
@@ -228,18 +633,20 @@ class FirebaseService:
             logger.error(f"Error getting user analytics: {str(e)}")
             return {}
     
-    def _calculate_progress_trend(self, sessions: List[Dict]) -> str:
+    def _calculate_progress_trend(self, sessions: List[Dict], sessions_are_sorted_desc: bool = False) -> str:
         """
         Calculate if user is improving, declining, or stable
         """
         if len(sessions) < 3:
             return "insufficient_data"
         
-        # Sort by timestamp
-        sessions.sort(key=lambda x: x.get('timestamp', 0))
+        # Newest first; queries ordered by timestamp descending can skip the sort
+        if not sessions_are_sorted_desc:
+            sessions = sorted(sessions, key=lambda x: x.get('timestamp', 0), reverse=True)
         
-        recent_avg = sum(s.get('score', 0) for s in sessions[-5:]) / min(5, len(sessions))
-        earlier_avg = sum(s.get('score', 0) for s in sessions[:-5]) / max(1, len(sessions) - 5)
+        scores = np.fromiter((s.get('score', 0) for s in sessions), dtype=np.float64, count=len(sessions))
+        recent_avg = scores[:5].mean()
+        earlier_avg = scores[5:].mean() if len(scores) > 5 else 0.0
         
         if recent_avg > earlier_avg + 5:
             return "improving"
@@ -248,19 +655,33 @@ class FirebaseService:
         else:
             return "stable"
     
-    def _identify_strong_areas(self, sessions: List[Dict]) -> List[str]:
-        """
-        Identify areas where user performs well
-        """
-        # Placeholder implementation
-        return ["pronunciation", "rhythm"]
-    
-    def _identify_improvement_areas(self, sessions: List[Dict]) -> List[str]:
+    def _identify_areas(self, sessions: List[Dict]) -> Tuple[List[str], List[str]]:
         """
-        Identify areas needing improvement
+        Identify areas where user performs well and areas needing improvement
+        from the per-category session scores, in a single pass
         """
-        # Placeholder implementation
-        return ["clarity", "confidence"]
+        scores = np.array([
+            [s.get('category_scores', {}).get(category, np.nan) for category in AREA_CATEGORIES]
+            for s in sessions
+            if s.get('category_scores')
+        ], dtype=np.float64).reshape(-1, len(AREA_CATEGORIES))
+        
+        # No scored sessions yet: keep the default guidance
+        if not scores.size:
+            return ["pronunciation", "rhythm"], ["clarity", "confidence"]
+        
+        # Unscored categories rank last for strengths and first for improvement
+        counts = np.count_nonzero(~np.isnan(scores), axis=0)
+        means = np.where(counts > 0, np.nansum(scores, axis=0) / np.maximum(counts, 1), -np.inf)
+        order = np.argsort(-means, kind="stable")
+        strong = [AREA_CATEGORIES[i] for i in order[:AREAS_REPORTED] if np.isfinite(means[i])]
+        weak = [AREA_CATEGORIES[i] for i in order[::-1][:AREAS_REPORTED]]
+        return strong, weak
+
+@lru_cache(maxsize=1)
+def get_firebase() -> AsyncFirebaseService:
+    """Get the process-wide Firebase service (created on first call)"""
+    return AsyncFirebaseService()
 
 # Global instance
-firebase_service = FirebaseService()
+firebase_service = get_firebase()
@@ -1,12 +1,25 @@
 import os
-import json
+import time
+import uuid
+import hashlib
+import orjson
 import logging
-from typing import Optional, Dict, Any
+from pathlib import Path
+from functools import cached_property
+from typing import Optional, Dict, Any, AsyncIterator, Literal
 from google.cloud import speech, texttospeech
 from google.oauth2 import service_account
 
 logger = logging.getLogger(__name__)
 
+# Synthesized speech is cached on disk, keyed by text, voice, speed and language
+# (directory and size cap come from TTS_CACHE_DIR / TTS_CACHE_MAX_MB, read in startup())
+DEFAULT_TTS_CACHE_MAX_MB = 512
+TTS_CACHE_PRUNE_RATIO = 0.9  # Prune down to this share of the cap so evictions are batched
+# Files served or written this recently are never pruned, so a FileResponse still
+# streaming one is not cut short (hits refresh the mtime before being served)
+TTS_CACHE_MIN_AGE_SECONDS = 300
+
 class GoogleCloudService:
     """
     Google Cloud Speech-to-Text and Text-to-Speech service
@@ -14,13 +27,22 @@ class GoogleCloudService:
     
     def __init__(self):
         self.credentials = None
-        self.speech_client = None
-        self.tts_client = None
-        self._initialize_clients()
+        self.tts_cache_dir: Optional[Path] = None
+        self.tts_cache_max_bytes = DEFAULT_TTS_CACHE_MAX_MB * 1024 * 1024
+        self._tts_cache_bytes = 0
+        self._load_credentials()
+    
+    def startup(self):
+        """
+        Resolve the TTS cache location and bring it under its size cap (call once at app startup)
+        """
+        self.tts_cache_dir = Path(os.getenv('TTS_CACHE_DIR', os.path.join(os.getcwd(), "tmp", "tts_cache")))
+        self.tts_cache_max_bytes = int(os.getenv('TTS_CACHE_MAX_MB', str(DEFAULT_TTS_CACHE_MAX_MB))) * 1024 * 1024
+        self._prune_tts_cache()
     
-    def _initialize_clients(self):
+    def _load_credentials(self):
         """
-        Initialize Google Cloud clients with service account credentials
+        Load service account credentials; API clients are created on first use
         """
         try:
             # Load service account from environment or file
@@ -35,44 +57,74 @@ class GoogleCloudService:
                 # Load from environment variable (JSON string)
                 service_account_info = os.getenv('GOOGLE_SERVICE_ACCOUNT_JSON')
                 if service_account_info:
-                    service_account_dict = json.loads(service_account_info)
+                    service_account_dict = orjson.loads(service_account_info)
                     self.credentials = service_account.Credentials.from_service_account_info(
                         service_account_dict
                     )
             
-            if self.credentials:
-                self.speech_client = speech.SpeechClient(credentials=self.credentials)
-                self.tts_client = texttospeech.TextToSpeechClient(credentials=self.credentials)
-                logger.info("Google Cloud clients initialized successfully")
-            else:
+            if not self.credentials:
                 logger.warning("Google Cloud credentials not found. Services will be limited.")
                 
         except Exception as e:
-            logger.error(f"Failed to initialize Google Cloud clients: {str(e)}")
+            logger.error(f"Failed to load Google Cloud credentials: {str(e)}")
+    
+    @cached_property
+    def speech_client(self) -> Optional[speech.SpeechClient]:
+        """Speech-to-Text client, shared by all requests"""
+        if not self.credentials:
+            return None
+        try:
+            return speech.SpeechClient(credentials=self.credentials)
+        except Exception as e:
+            logger.error(f"Failed to initialize Speech client: {str(e)}")
+            return None
+    
+    @cached_property
+    def speech_async_client(self) -> Optional[speech.SpeechAsyncClient]:
+        """Async Speech-to-Text client for streaming recognition (create from the event loop)"""
+        if not self.credentials:
+            return None
+        try:
+            return speech.SpeechAsyncClient(credentials=self.credentials)
+        except Exception as e:
+            logger.error(f"Failed to initialize async Speech client: {str(e)}")
+            return None
     
-    def speech_to_text(self, audio_path: str, language_code: str = "id-ID") -> Dict[str, Any]:
+    @cached_property
+    def tts_client(self) -> Optional[texttospeech.TextToSpeechClient]:
+        """Text-to-Speech client, shared by all requests"""
+        if not self.credentials:
+            return None
+        try:
+            return texttospeech.TextToSpeechClient(credentials=self.credentials)
+        except Exception as e:
+            logger.error(f"Failed to initialize TTS client: {str(e)}")
+            return None
+    
+    def speech_to_text(self, audio_path: Optional[str] = None, language_code: str = "id-ID",
+                       audio_bytes: Optional[bytes] = None,
+                       detail: Literal["transcript", "words"] = "transcript",
+                       punctuate: bool = False) -> Dict[str, Any]:
         """
         Convert speech audio to text using Google Cloud Speech-to-Text
+        Accepts either a file path or the raw audio bytes; per-word metadata
+        is only requested with detail="words"
         """
         if not self.speech_client:
             logger.error("Speech client not initialized")
             return {"text": "", "confidence": 0.0}
         
         try:
-            # Read audio file
-            with open(audio_path, 'rb') as audio_file:
-                audio_content = audio_file.read()
+            # Read audio file unless the content was passed in directly
+            if audio_bytes is not None:
+                audio_content = audio_bytes
+            else:
+                with open(audio_path, 'rb') as audio_file:
+                    audio_content = audio_file.read()
             
             # Configure audio settings
             audio = speech.RecognitionAudio(content=audio_content)
-            config = speech.RecognitionConfig(
-                encoding=speech.RecognitionConfig.AudioEncoding.WEBM_OPUS,
-                sample_rate_hertz=48000,
-                language_code=language_code,
-                enable_automatic_punctuation=True,
-                enable_word_confidence=True,
-                enable_word_time_offsets=True,
-            )
+            config = self._recognition_config(language_code, detail, punctuate)
             
             # Perform speech recognition
             response = self.speech_client.recognize(config=config, audio=audio)
@@ -93,6 +145,63 @@ class GoogleCloudService:
             logger.error(f"Speech-to-text error: {str(e)}")
             return {"text": "", "confidence": 0.0}
     
+    async def streaming_speech_to_text(self, audio_chunks: AsyncIterator[bytes],
+                                       language_code: str = "id-ID",
+                                       detail: Literal["transcript", "words"] = "transcript",
+                                       punctuate: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream audio chunks to Speech-to-Text as they arrive and yield
+        interim and final transcripts while recognition is still running
+        """
+        if not self.speech_async_client:
+            logger.error("Speech client not initialized")
+            return
+        
+        streaming_config = speech.StreamingRecognitionConfig(
+            config=self._recognition_config(language_code, detail, punctuate),
+            interim_results=True
+        )
+        
+        async def requests():
+            # The first request carries the config, the rest carry audio
+            yield speech.StreamingRecognizeRequest(streaming_config=streaming_config)
+            async for chunk in audio_chunks:
+                yield speech.StreamingRecognizeRequest(audio_content=chunk)
+        
+        try:
+            responses = await self.speech_async_client.streaming_recognize(requests=requests())
+            async for response in responses:
+                for result in response.results:
+                    if not result.alternatives:
+                        continue
+                    alternative = result.alternatives[0]
+                    yield {
+                        "text": alternative.transcript,
+                        "confidence": alternative.confidence,
+                        "is_final": result.is_final
+                    }
+                    
+        except Exception as e:
+            logger.error(f"Streaming speech-to-text error: {str(e)}")
+    
+    @staticmethod
+    def _recognition_config(language_code: str, detail: str = "transcript",
+                            punctuate: bool = False) -> speech.RecognitionConfig:
+        """
+        Recognition settings shared by the unary and streaming paths
+        Word confidence/offsets and punctuation cost backend time, so they are opt-in
+        (short training prompts are compared without punctuation anyway)
+        """
+        word_details = detail == "words"
+        return speech.RecognitionConfig(
+            encoding=speech.RecognitionConfig.AudioEncoding.WEBM_OPUS,
+            sample_rate_hertz=48000,
+            language_code=language_code,
+            enable_automatic_punctuation=punctuate,
+            enable_word_confidence=word_details,
+            enable_word_time_offsets=word_details,
+        )
+    
     def text_to_speech(self, text: str, language_code: str = "id-ID", 
                       voice_name: str = "id-ID-Standard-A", speed: float = 1.0) -> Optional[bytes]:
         """
@@ -135,6 +244,82 @@ class GoogleCloudService:
             logger.error(f"Text-to-speech error: {str(e)}")
             return None
     
+    def text_to_speech_file(self, text: str, language_code: str = "id-ID",
+                            voice_name: str = "id-ID-Standard-A", speed: float = 1.0) -> Optional[Path]:
+        """
+        Get the cached MP3 for this text and voice, synthesizing it on the first request
+        """
+        if self.tts_cache_dir is None:
+            self.startup()
+        
+        key = hashlib.blake2b(
+            f"{text}|{voice_name}|{speed}|{language_code}".encode(), digest_size=16
+        ).hexdigest()
+        cache_path = self.tts_cache_dir / f"{key}.mp3"
+        if cache_path.exists():
+            try:
+                # Refresh the modification time so eviction drops least recently used files first
+                os.utime(cache_path)
+                return cache_path
+            except FileNotFoundError:
+                pass  # Evicted by another worker in the meantime
+        
+        audio_content = self.text_to_speech(text, language_code, voice_name, speed)
+        if audio_content is None:
+            return None
+        
+        try:
+            # Write to a unique temp name first so concurrent workers never serve a partial file
+            self.tts_cache_dir.mkdir(parents=True, exist_ok=True)
+            temp_path = cache_path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+            temp_path.write_bytes(audio_content)
+            os.replace(temp_path, cache_path)
+            
+            self._tts_cache_bytes += len(audio_content)
+            if self._tts_cache_bytes > self.tts_cache_max_bytes:
+                self._prune_tts_cache(keep=cache_path)
+            return cache_path
+            
+        except Exception as e:
+            logger.error(f"Error caching synthesized speech: {str(e)}")
+            return None
+    
+    def _prune_tts_cache(self, keep: Optional[Path] = None):
+        """
+        Delete the least recently used cached files once the cache exceeds its size cap,
+        skipping files used within TTS_CACHE_MIN_AGE_SECONDS (the cap may be exceeded meanwhile)
+        The running size is re-measured from disk, since other workers share the directory
+        """
+        try:
+            entries = []
+            total = 0
+            if self.tts_cache_dir.is_dir():
+                for entry in os.scandir(self.tts_cache_dir):
+                    if entry.is_file() and entry.name.endswith(".mp3"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+                        total += stat.st_size
+            
+            if total > self.tts_cache_max_bytes:
+                target = self.tts_cache_max_bytes * TTS_CACHE_PRUNE_RATIO
+                min_mtime = time.time() - TTS_CACHE_MIN_AGE_SECONDS
+                for mtime, size, path in sorted(entries):
+                    # Oldest first: everything from here on may still be in use
+                    if total <= target or mtime > min_mtime:
+                        break
+                    if keep is not None and path == str(keep):
+                        continue
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                    total -= size
+            
+            self._tts_cache_bytes = total
+            
+        except Exception as e:
+            logger.error(f"Error pruning TTS cache: {str(e)}")
+    
     def get_available_voices(self, language_code: str = "id-ID") -> list:
         """
         Get list of available voices for specified language
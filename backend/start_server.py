@@ -10,6 +10,8 @@ import subprocess
 import logging
 from pathlib import Path
 
+from requirements_cache import requirements_up_to_date, mark_requirements_installed
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -47,9 +49,13 @@ def check_firebase_credentials():
 
 def install_dependencies():
     """Install Python dependencies"""
+    if requirements_up_to_date():
+        return True
+    
     logger.info("Installing dependencies...")
     try:
         subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"], check=True)
+        mark_requirements_installed()
         logger.info("Dependencies installed successfully")
     except subprocess.CalledProcessError as e:
         logger.error(f"Failed to install dependencies: {e}")
@@ -72,26 +78,26 @@ def run_server():
     logger.info("  - Health Check: http://localhost:8000/api/health")
     logger.info("\nPress Ctrl+C to stop the server")
     
+    # Auto-reload only for development (ZEKO_DEV=1); it runs a file watcher and a child process.
+    # "auto" picks uvloop and httptools (installed with uvicorn[standard]) where available
+    server_options = dict(
+        host="0.0.0.0",
+        port=8000,
+        reload=os.getenv("ZEKO_DEV") == "1",
+        loop="auto",
+        http="auto",
+        workers=int(os.getenv("UVICORN_WORKERS", "1")),
+        log_level="info"
+    )
+    
     try:
         import uvicorn
-        uvicorn.run(
-            "main:app",
-            host="0.0.0.0",
-            port=8000,
-            reload=True,
-            log_level="info"
-        )
+        uvicorn.run("main:create_app", factory=True, **server_options)
     except ImportError:
         logger.error("uvicorn not found. Installing...")
         subprocess.run([sys.executable, "-m", "pip", "install", "uvicorn[standard]"], check=True)
         import uvicorn
-        uvicorn.run(
-            "main:app",
-            host="0.0.0.0",
-            port=8000,
-            reload=True,
-            log_level="info"
-        )
+        uvicorn.run("main:create_app", factory=True, **server_options)
     except KeyboardInterrupt:
         logger.info("\nServer stopped by user")
     except Exception as e:
@@ -115,8 +121,11 @@ def main():
     check_firebase_credentials()
     create_directories()
     
-    # Ask user if they want to install dependencies
-    install_deps = input("\nInstall/update dependencies? (y/n): ").lower().strip()
+    # Ask user if they want to install dependencies (headless starts never block on a prompt)
+    if sys.stdin.isatty():
+        install_deps = input("\nInstall/update dependencies? (y/n): ").lower().strip()
+    else:
+        install_deps = "n"
     if install_deps in ['y', 'yes', '']:
         if not install_dependencies():
             sys.exit(1)
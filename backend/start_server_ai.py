@@ -11,8 +11,11 @@ import sys
 import subprocess
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from requirements_cache import requirements_up_to_date, mark_requirements_installed
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -60,11 +63,15 @@ def install_requirements():
         logger.error("requirements.txt not found")
         return False
     
+    if requirements_up_to_date():
+        return True
+    
     try:
         logger.info("Installing requirements...")
         subprocess.run([
             sys.executable, "-m", "pip", "install", "-r", "requirements.txt"
         ], check=True, capture_output=True, text=True)
+        mark_requirements_installed()
         logger.info("Requirements installed successfully")
         return True
     except subprocess.CalledProcessError as e:
@@ -134,7 +141,7 @@ def test_api_imports():
     try:
         logger.info("Testing API imports...")
         
-        from main import app
+        from main import create_app
         from routers import speech, emotion, progress, gamification, ai_models
         
         logger.info("✅ All API modules imported successfully")
@@ -160,13 +167,17 @@ def start_server():
         logger.info(f"API Documentation: http://{host}:{port}/api/docs")
         logger.info(f"AI Models Endpoints: http://{host}:{port}/api/ai")
         
-        # Start server
+        # Start server (auto-reload only with ZEKO_DEV=1; "auto" picks uvloop/httptools where available)
         uvicorn.run(
-            "main:app",
+            "main:create_app",
+            factory=True,
             host=host,
             port=port,
-            reload=True,
+            reload=os.getenv("ZEKO_DEV") == "1",
             reload_dirs=["./"],
+            loop="auto",
+            http="auto",
+            workers=int(os.getenv("UVICORN_WORKERS", "1")),
             log_level="info"
         )
         
@@ -199,14 +210,22 @@ def main():
     if not install_requirements():
         logger.warning("Proceeding with potential missing dependencies...")
     
-    # Test AI models
-    if not test_ai_models():
-        logger.warning("AI models may not work properly")
-    
-    # Test API imports
-    if not test_api_imports():
-        logger.error("❌ Critical API import failure")
-        sys.exit(1)
+    # Import checks load the whole app, which the server process does again;
+    # only run them on request (--healthcheck)
+    if "--healthcheck" in sys.argv:
+        # Test AI models and API imports concurrently (requirements must be installed first)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            ai_models_future = executor.submit(test_ai_models)
+            api_imports_future = executor.submit(test_api_imports)
+            ai_models_ok = ai_models_future.result()
+            api_imports_ok = api_imports_future.result()
+        
+        if not ai_models_ok:
+            logger.warning("AI models may not work properly")
+        
+        if not api_imports_ok:
+            logger.error("❌ Critical API import failure")
+            sys.exit(1)
     
     # Start server
     print("\n" + "=" * 60)
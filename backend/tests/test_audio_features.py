@@ -0,0 +1,38 @@
+import librosa
+import numpy as np
+
+from ai_models.audio_features import AudioFeatureExtractor, _mel_cepstrum, _mel_cepstrum_numpy
+
+def _test_audio(sample_rate: int) -> np.ndarray:
+    t = np.arange(sample_rate) / sample_rate
+    rng = np.random.default_rng(0)
+    tone = 0.5 * np.sin(2 * np.pi * 220 * t) + 0.25 * np.sin(2 * np.pi * 1320 * t)
+    return (tone + 0.01 * rng.standard_normal(t.size)).astype(np.float32)
+
+def test_extract_mfcc_matches_librosa():
+    extractor = AudioFeatureExtractor()
+    audio = _test_audio(extractor.sample_rate)
+    expected = librosa.feature.mfcc(
+        y=audio,
+        sr=extractor.sample_rate,
+        n_mfcc=extractor.n_mfcc,
+        n_fft=extractor.n_fft,
+        hop_length=extractor.hop_length,
+        n_mels=extractor.n_mels
+    )
+    result = extractor.extract_mfcc(audio)
+    assert result.shape == expected.shape
+    assert result.dtype == np.float32
+    np.testing.assert_allclose(result, expected, rtol=1e-3, atol=1e-2)
+
+def test_mel_cepstrum_kernel_matches_numpy():
+    extractor = AudioFeatureExtractor()
+    mel_basis, dct_basis = extractor._get_mfcc_bases()
+    audio = _test_audio(extractor.sample_rate)
+    power_spec = np.abs(librosa.stft(y=audio, n_fft=extractor.n_fft, hop_length=extractor.hop_length)) ** 2
+    power_spec = np.ascontiguousarray(power_spec, dtype=np.float32)
+    np.testing.assert_allclose(
+        _mel_cepstrum(power_spec, mel_basis, dct_basis),
+        _mel_cepstrum_numpy(power_spec, mel_basis, dct_basis),
+        rtol=1e-3, atol=1e-2
+    )
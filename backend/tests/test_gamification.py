@@ -0,0 +1,39 @@
+from routers.gamification import _progress_for, _tally_sessions
+
+def test_tally_sessions_counts_activities_and_perfect_scores():
+    sessions = [
+        {"activity_type": "singing", "accuracy_score": 100},
+        {"activity_type": "singing", "accuracy_score": 90},
+        {"activity_type": "storytelling", "accuracy_score": 100},
+        {"activity_type": "speech_training"},
+    ]
+    activity_counts, perfect_count = _tally_sessions(sessions)
+    assert activity_counts == {"singing": 2, "storytelling": 1, "speech_training": 1}
+    assert perfect_count == 2
+
+def test_tally_sessions_empty():
+    activity_counts, perfect_count = _tally_sessions([])
+    assert not activity_counts
+    assert perfect_count == 0
+
+def test_progress_for_session_based_achievements():
+    activity_counts, perfect_count = _tally_sessions(
+        [{"activity_type": "singing", "accuracy_score": 100}] * 3
+        + [{"activity_type": "speech_training", "accuracy_score": 60}]
+    )
+    assert _progress_for("first_speech", {}, activity_counts, perfect_count) == 100
+    assert _progress_for("singer", {}, activity_counts, perfect_count) == 30
+    assert _progress_for("storyteller", {}, activity_counts, perfect_count) == 0
+    assert _progress_for("perfect_week", {}, activity_counts, perfect_count) == 3 / 7 * 100
+
+def test_progress_for_profile_based_achievements():
+    progress = {"total_points": 250, "current_streak": 5, "current_level": 2,
+                "accuracy_sum": 180.0, "accuracy_count": 2}
+    activity_counts, perfect_count = _tally_sessions([])
+    assert _progress_for("point_collector_100", progress, activity_counts, perfect_count) == 100
+    assert _progress_for("point_collector_1000", progress, activity_counts, perfect_count) == 25
+    assert _progress_for("streak_warrior_3", progress, activity_counts, perfect_count) == 100
+    assert _progress_for("level_5", progress, activity_counts, perfect_count) == 40
+    assert _progress_for("accuracy_master", progress, activity_counts, perfect_count) == 90
+    assert _progress_for("accuracy_master", {"average_accuracy": 97.0}, activity_counts, perfect_count) == 100
+    assert _progress_for("unknown", progress, activity_counts, perfect_count) == 0
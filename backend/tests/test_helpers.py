@@ -0,0 +1,36 @@
+import numpy as np
+from rapidfuzz import fuzz
+
+from utils.helpers import (
+    calculate_difficulty_score,
+    calculate_difficulty_score_batch,
+    calculate_text_accuracy_batch,
+    estimate_syllables,
+    estimate_syllables_batch,
+)
+
+def test_estimate_syllables_batch_empty():
+    result = estimate_syllables_batch([])
+    assert result.shape == (0,)
+    assert result.dtype == np.int32
+
+def test_estimate_syllables_batch_matches_single_word():
+    words = ["ibu", "makan", "Buaya", "strr", "", "aéa", "ka\0ta"]
+    assert estimate_syllables_batch(words).tolist() == [estimate_syllables(word) for word in words]
+
+def test_calculate_difficulty_score_batch_empty():
+    assert calculate_difficulty_score_batch([]).shape == (0,)
+
+def test_calculate_difficulty_score_batch_matches_single_word():
+    words = ["ibu", "makan", "pelangi", "kupu-kupu", "matahari terbenam"]
+    assert calculate_difficulty_score_batch(words).tolist() == [calculate_difficulty_score(word) for word in words]
+
+def test_calculate_text_accuracy_batch_matches_pairwise_ratio():
+    expected = ["Ibu pergi ke pasar", "kupu-kupu", ""]
+    actual = ["ibu pergi ke pasar", "Kupu kupu", "makan"]
+    result = calculate_text_accuracy_batch(expected, actual)
+    assert result.shape == (3, 3)
+    assert result.dtype == np.float32
+    for i, text in enumerate(expected):
+        for j, spoken in enumerate(actual):
+            assert result[i, j] == np.float32(fuzz.ratio(text.lower(), spoken.lower()))
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+from routers.progress import ProgressUpdateRequest, build_progress_write, calculate_progress_update
+
+def _request(**overrides):
+    fields = {
+        "user_id": "user-1",
+        "session_id": "session-1",
+        "activity_type": "singing",
+        "points_earned": 20,
+        "accuracy_score": 80.0,
+    }
+    fields.update(overrides)
+    return ProgressUpdateRequest(**fields)
+
+def _day(days_ago: int) -> str:
+    return (datetime.utcnow().date() - timedelta(days=days_ago)).isoformat()
+
+def test_calculate_progress_update_first_session():
+    updated = calculate_progress_update({}, _request())
+    assert updated["total_points"] == 20
+    assert updated["total_sessions"] == 1
+    assert updated["accuracy_sum"] == 80.0
+    assert updated["accuracy_count"] == 1
+    assert updated["average_accuracy"] == 80.0
+    assert updated["activity_frequency"] == {"singing": 1}
+    assert updated["favorite_activity"] == "singing"
+    assert updated["current_streak"] == 1
+    assert updated["weekly_progress"] == {_day(0): 20}
+
+def test_calculate_progress_update_seeds_accuracy_from_legacy_average():
+    current = {"total_sessions": 4, "average_accuracy": 90.0}
+    updated = calculate_progress_update(current, _request(accuracy_score=40.0))
+    assert updated["accuracy_count"] == 5
+    assert updated["accuracy_sum"] == 400.0
+    assert updated["average_accuracy"] == 80.0
+
+def test_calculate_progress_update_streak_and_weekly_window():
+    current = {
+        "current_streak": 3,
+        "last_session_date": _day(1),
+        "weekly_progress": {_day(7): 50, _day(6): 10, _day(0): 5},
+        "activity_frequency": {"storytelling": 2},
+        "favorite_activity": "storytelling",
+        "favorite_activity_count": 2,
+    }
+    updated = calculate_progress_update(current, _request())
+    assert updated["current_streak"] == 4
+    assert updated["weekly_progress"] == {_day(6): 10, _day(0): 25}
+    assert updated["favorite_activity"] == "storytelling"
+    assert current["weekly_progress"][_day(7)] == 50
+
+def test_build_progress_write_increments_and_deletes():
+    current = {
+        "accuracy_sum": 160.0,
+        "accuracy_count": 2,
+        "weekly_progress": {_day(7): 50, _day(1): 10},
+    }
+    request = _request()
+    updated = calculate_progress_update(current, request)
+    increments, updates, deletes = build_progress_write(current, updated, request)
+    assert increments == {
+        "total_points": 20,
+        "total_sessions": 1,
+        "activity_frequency.singing": 1,
+        f"weekly_progress.{_day(0)}": 20,
+        "accuracy_sum": 80.0,
+        "accuracy_count": 1,
+    }
+    assert "accuracy_sum" not in updates
+    assert updates["current_streak"] == 1
+    assert deletes == [f"weekly_progress.{_day(7)}"]
+
+def test_build_progress_write_sets_migrated_accuracy():
+    current = {"total_sessions": 4, "average_accuracy": 90.0}
+    request = _request(accuracy_score=40.0)
+    updated = calculate_progress_update(current, request)
+    increments, updates, deletes = build_progress_write(current, updated, request)
+    assert "accuracy_sum" not in increments
+    assert updates["accuracy_sum"] == 400.0
+    assert updates["accuracy_count"] == 5
+    assert deletes == []
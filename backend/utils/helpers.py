@@ -1,20 +1,130 @@
 import os
-import uuid
+import re
+import sys
+import asyncio
+import random
+import secrets
+import tempfile
+import time
+import itertools
+from contextlib import contextmanager
+from functools import lru_cache
+from collections import deque
 from datetime import datetime
-from typing import Optional
+from pathlib import Path
+from types import MappingProxyType
+from typing import Iterator, List, Mapping, Optional
+import numpy as np
+import orjson
 from fastapi import UploadFile
+from rapidfuzz import fuzz, process
 
-# Allowed audio file extensions
-ALLOWED_AUDIO_EXTENSIONS = {'.wav', '.mp3', '.m4a', '.ogg', '.flac'}
+# Optional numba JIT for bulk syllable counting
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Allowed audio file extensions (a tuple so it can be passed to str.endswith)
+ALLOWED_AUDIO_EXTENSIONS = ('.wav', '.mp3', '.m4a', '.ogg', '.flac')
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+MAX_TEXT_LENGTH = 500
+
+# Directory for temporary upload files (created once at import)
+TMP_DIR = Path.cwd() / "tmp"
+TMP_DIR.mkdir(exist_ok=True)
+
+# Each run of consecutive vowels counts as one syllable
+_VOWEL_RUN = re.compile(r'[aiueo]+', re.IGNORECASE)
+_WHITESPACE_RUN = re.compile(r'\s+')
+# Any whitespace other than a single interior space
+_UNCLEAN_WHITESPACE = re.compile(r'[^\S ]|  |^ | $')
+
+_DIFFICULTY_LEVELS = ("easy", "medium", "hard")
+_DIFFICULTY_LABELS = np.array(_DIFFICULTY_LEVELS)
+
+# Read-only content settings for ages <= 6, <= 9 and older
+_AGE_CONTENT = (
+    MappingProxyType({
+        "max_word_length": 2,
+        "categories": ("family", "animals", "colors"),
+        "voice_speed": 0.8,
+        "encouragement_level": "high"
+    }),
+    MappingProxyType({
+        "max_word_length": 3,
+        "categories": ("family", "animals", "colors", "school", "food"),
+        "voice_speed": 0.9,
+        "encouragement_level": "medium"
+    }),
+    MappingProxyType({
+        "max_word_length": 5,
+        "categories": ("family", "animals", "school", "activities", "emotions"),
+        "voice_speed": 1.0,
+        "encouragement_level": "balanced"
+    }),
+)
+
+# (upper bound in seconds, divisor, unit) for format_duration
+_DURATION_UNITS = (
+    (60.0, 1.0, "detik"),
+    (3600.0, 60.0, "menit"),
+    (float("inf"), 3600.0, "jam"),
+)
+
+# Private generator for message selection, independent of the shared module-level one
+_rng = random.Random()
+
+# Encouragement templates, ordered from "need practice" to "excellent"
+_ENCOURAGEMENT_MESSAGES = (
+    (
+        "Tidak apa-apa, {name}! Mari berlatih lagi! 🤗",
+        "Santai saja, {name}! Pelan-pelan ya! 🐢",
+        "Yuk coba lagi, {name}! Kamu pasti bisa! 💫"
+    ),
+    (
+        "Bagus, {name}! Masih bisa lebih baik! 😊",
+        "Tidak apa-apa, {name}! Coba lagi ya! 🤗",
+        "Hampir benar, {name}! Sekali lagi! 🌈"
+    ),
+    (
+        "Bagus sekali, {name}! 👏",
+        "Hebat! {name} terus berkembang! 🎉",
+        "Keren, {name}! Terus semangat! 💪"
+    ),
+    (
+        "Wah, {name} hebat sekali! 🌟",
+        "Perfect! {name} sangat pintar! ⭐",
+        "Luar biasa, {name}! Kamu champion! 🏆"
+    ),
+)
+
+# Random per-process prefix plus a counter keeps generated filenames unique
+# across workers and replicas (PIDs repeat between containers)
+_PROCESS_TAG = secrets.token_hex(2)
+_filename_counter = itertools.count()
+_filename_stamp_cache = [0, ""]
+
+# Pending user activity entries, written to stdout in batches by the flusher
+# (oldest entries are dropped if the flusher falls behind)
+_ACTIVITY_BUFFER: deque = deque(maxlen=65536)
+_ACTIVITY_FLUSH_SECONDS = 1.0
+
+# [epoch second, ISO string] of the last formatted response timestamp
+_timestamp_cache = [0, ""]
+
+# 1 for ASCII vowels (either case), 0 for every other byte
+_VOWEL_LUT = np.zeros(256, dtype=np.uint8)
+_VOWEL_LUT[np.frombuffer(b"aiueoAIUEO", dtype=np.uint8)] = 1
 
 def validate_audio_file(file: UploadFile) -> bool:
     """
     Validate uploaded audio file format and size
     """
-    # Check file extension
-    file_extension = os.path.splitext(file.filename)[1].lower()
-    if file_extension not in ALLOWED_AUDIO_EXTENSIONS:
+    # Check file extension (the longest one is 5 chars, so only the tail is lowercased)
+    filename = file.filename
+    if not filename or not filename[-5:].lower().endswith(ALLOWED_AUDIO_EXTENSIONS):
         return False
     
     # Check file size (this is approximate as we haven't read the file yet)
@@ -23,70 +133,75 @@ def validate_audio_file(file: UploadFile) -> bool:
 
 def generate_unique_filename(original_filename: Optional[str] = None) -> str:
     """
-    Generate unique filename with timestamp and UUID
+    Generate unique filename with timestamp, process tag and counter
     """
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    unique_id = str(uuid.uuid4())[:8]
+    now = int(time.time())
+    cache = _filename_stamp_cache
+    if cache[0] != now:
+        cache[0] = now
+        t = time.localtime(now)
+        cache[1] = "%04d%02d%02d_%02d%02d%02d" % (
+            t.tm_year, t.tm_mon, t.tm_mday, t.tm_hour, t.tm_min, t.tm_sec
+        )
+    unique_id = f"{_PROCESS_TAG}{next(_filename_counter) & 0xffff:04x}"
     
     if original_filename:
-        name, ext = os.path.splitext(original_filename)
-        return f"{timestamp}_{unique_id}_{name}{ext}"
+        return f"{cache[1]}_{unique_id}_{original_filename}"
     else:
-        return f"{timestamp}_{unique_id}"
-
-def calculate_age_appropriate_content(age: int) -> dict:
-    """
-    Return age-appropriate content configuration
-    """
-    if age <= 6:
-        return {
-            "max_word_length": 2,
-            "categories": ["family", "animals", "colors"],
-            "voice_speed": 0.8,
-            "encouragement_level": "high"
-        }
-    elif age <= 9:
-        return {
-            "max_word_length": 3,
-            "categories": ["family", "animals", "colors", "school", "food"],
-            "voice_speed": 0.9,
-            "encouragement_level": "medium"
-        }
-    else:
-        return {
-            "max_word_length": 5,
-            "categories": ["family", "animals", "school", "activities", "emotions"],
-            "voice_speed": 1.0,
-            "encouragement_level": "balanced"
-        }
+        return f"{cache[1]}_{unique_id}"
+
+@contextmanager
+def temporary_audio_file(content: bytes, original_filename: Optional[str] = None,
+                         suffix: Optional[str] = None) -> Iterator[str]:
+    """
+    Write uploaded audio to a temporary file and remove it when the block exits
+    The file extension is taken from suffix if given, else from original_filename
+    """
+    if suffix is None:
+        suffix = os.path.splitext(original_filename)[1] if original_filename else ""
+    # Closed before use so other libraries can reopen it by name (also on Windows)
+    temp_file = tempfile.NamedTemporaryFile(suffix=suffix, dir=TMP_DIR, delete=False)
+    try:
+        with temp_file:
+            temp_file.write(content)
+        yield temp_file.name
+    finally:
+        try:
+            os.remove(temp_file.name)
+        except FileNotFoundError:
+            pass
+
+def calculate_age_appropriate_content(age: int) -> Mapping:
+    """
+    Return age-appropriate content configuration (shared, read-only)
+    """
+    return _AGE_CONTENT[0 if age <= 6 else 1 if age <= 9 else 2]
 
 def format_duration(seconds: float) -> str:
     """
     Format duration in seconds to human-readable format
     """
-    if seconds < 60:
-        return f"{seconds:.1f} detik"
-    elif seconds < 3600:
-        minutes = seconds / 60
-        return f"{minutes:.1f} menit"
-    else:
-        hours = seconds / 3600
-        return f"{hours:.1f} jam"
+    for threshold, divisor, unit in _DURATION_UNITS:
+        if seconds < threshold:
+            break
+    return f"{seconds / divisor:.1f} {unit}"
 
 def sanitize_text(text: str) -> str:
     """
     Sanitize text input for safe processing
     """
-    # Remove potentially harmful characters
-    sanitized = text.strip()
-    # Remove excessive whitespace
-    sanitized = ' '.join(sanitized.split())
-    # Limit length
-    if len(sanitized) > 500:
-        sanitized = sanitized[:500]
+    # Already clean (short, only single interior spaces): nothing to do
+    if len(text) <= MAX_TEXT_LENGTH and not _UNCLEAN_WHITESPACE.search(text):
+        return text
     
-    return sanitized
+    # Clip oversized input first so the rest never scans more than a bounded prefix
+    sanitized = text[:MAX_TEXT_LENGTH * 8].strip()
+    # Collapse whitespace runs in a single pass
+    sanitized = _WHITESPACE_RUN.sub(' ', sanitized)
+    # Limit length
+    return sanitized[:MAX_TEXT_LENGTH]
 
+@lru_cache(maxsize=16384)
 def calculate_difficulty_score(word: str) -> str:
     """
     Calculate difficulty level based on word characteristics
@@ -94,82 +209,196 @@ def calculate_difficulty_score(word: str) -> str:
     length = len(word)
     syllable_count = estimate_syllables(word)
     
-    if length <= 4 and syllable_count <= 2:
-        return "easy"
-    elif length <= 8 and syllable_count <= 3:
-        return "medium"
-    else:
-        return "hard"
+    # Every word past the "medium" limits is also past the "easy" ones
+    level = (length > 4 or syllable_count > 2) + (length > 8 or syllable_count > 3)
+    return _DIFFICULTY_LEVELS[level]
 
+def calculate_difficulty_score_batch(words: List[str]) -> np.ndarray:
+    """
+    Calculate difficulty levels for a list of words at once
+    Returns an array of "easy"/"medium"/"hard" labels in input order
+    """
+    lengths = np.fromiter(map(len, words), dtype=np.int32, count=len(words))
+    syllable_counts = estimate_syllables_batch(words)
+    
+    levels = (
+        ((lengths > 4) | (syllable_counts > 2)).astype(np.uint8)
+        + ((lengths > 8) | (syllable_counts > 3))
+    )
+    return _DIFFICULTY_LABELS.take(levels)
+
+@lru_cache(maxsize=16384)
 def estimate_syllables(word: str) -> int:
     """
     Estimate syllable count for Indonesian words
     """
-    vowels = "aiueo"
-    word = word.lower()
-    syllable_count = 0
-    prev_was_vowel = False
+    # Ensure at least 1 syllable
+    return max(1, len(_VOWEL_RUN.findall(word)))
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _count_syllables_packed(buf, n_words):
+        """
+        Count vowel runs per word in one pass over NUL-separated word bytes
+        
+        Args:
+            buf: uint8[:] words joined and terminated by NUL bytes
+            n_words: number of words in buf
+            
+        Returns:
+            int32[:] syllable count per word (at least 1)
+        """
+        counts = np.empty(n_words, dtype=np.int32)
+        word_idx = 0
+        count = 0
+        prev = 0
+        for c in buf:
+            if c == 0:
+                counts[word_idx] = max(1, count)
+                word_idx += 1
+                count = 0
+                prev = 0
+            else:
+                is_vowel = _VOWEL_LUT[c]
+                count += is_vowel & (prev ^ 1)
+                prev = is_vowel
+        return counts
+
+def estimate_syllables_batch(words: List[str]) -> np.ndarray:
+    """
+    Estimate syllable counts for a list of words at once
+    """
+    if not words:
+        return np.empty(0, dtype=np.int32)
     
-    for char in word:
-        is_vowel = char in vowels
-        if is_vowel and not prev_was_vowel:
-            syllable_count += 1
-        prev_was_vowel = is_vowel
+    if not NUMBA_AVAILABLE:
+        return np.fromiter(
+            (max(1, len(_VOWEL_RUN.findall(word))) for word in words),
+            dtype=np.int32,
+            count=len(words)
+        )
     
-    # Ensure at least 1 syllable
-    return max(1, syllable_count)
+    # The kernel writes one count per NUL without bounds checks, so the buffer
+    # must hold exactly len(words) separators; NULs inside words become spaces
+    joined = "\0".join(words)
+    if joined.count("\0") != len(words) - 1:
+        joined = "\0".join(word.replace("\0", " ") for word in words)
+    # Non-ASCII characters become "?" so they still separate vowel runs
+    packed = (joined + "\0").encode("ascii", "replace")
+    return _count_syllables_packed(np.frombuffer(packed, dtype=np.uint8), len(words))
+
+def warmup_syllable_kernel():
+    """
+    Trigger JIT compilation on a tiny input so the first request doesn't pay for it
+    """
+    estimate_syllables_batch(["kata"])
+
+def calculate_text_accuracy_batch(expected: List[str], actual: List[str]) -> np.ndarray:
+    """
+    Calculate accuracy percentage for every expected/actual pair at once
+    Returns a (len(expected), len(actual)) float32 matrix
+    """
+    return process.cdist(
+        expected, actual,
+        scorer=fuzz.ratio,
+        processor=str.lower,
+        dtype=np.float32,
+        workers=-1
+    )
 
 def get_encouragement_message(score: float, child_name: str = "Adik") -> str:
     """
     Get personalized encouragement message based on score
     """
-    messages = {
-        "excellent": [
-            f"Wah, {child_name} hebat sekali! 🌟",
-            f"Perfect! {child_name} sangat pintar! ⭐",
-            f"Luar biasa, {child_name}! Kamu champion! 🏆"
-        ],
-        "good": [
-            f"Bagus sekali, {child_name}! 👏",
-            f"Hebat! {child_name} terus berkembang! 🎉",
-            f"Keren, {child_name}! Terus semangat! 💪"
-        ],
-        "okay": [
-            f"Bagus, {child_name}! Masih bisa lebih baik! 😊",
-            f"Tidak apa-apa, {child_name}! Coba lagi ya! 🤗",
-            f"Hampir benar, {child_name}! Sekali lagi! 🌈"
-        ],
-        "need_practice": [
-            f"Tidak apa-apa, {child_name}! Mari berlatih lagi! 🤗",
-            f"Santai saja, {child_name}! Pelan-pelan ya! 🐢",
-            f"Yuk coba lagi, {child_name}! Kamu pasti bisa! 💫"
-        ]
-    }
-    
-    import random
-    
-    if score >= 90:
-        return random.choice(messages["excellent"])
-    elif score >= 75:
-        return random.choice(messages["good"])
-    elif score >= 60:
-        return random.choice(messages["okay"])
-    else:
-        return random.choice(messages["need_practice"])
+    # 0 = need practice ... 3 = excellent
+    bucket = _ENCOURAGEMENT_MESSAGES[(score >= 60) + (score >= 75) + (score >= 90)]
+    return bucket[_rng.randrange(len(bucket))].format(name=child_name)
+
+def get_average_accuracy(progress: dict) -> float:
+    """
+    Get average accuracy from the stored (accuracy_sum, accuracy_count) pair,
+    falling back to the legacy average_accuracy field
+    """
+    accuracy_count = progress.get("accuracy_count", 0)
+    if accuracy_count:
+        return progress.get("accuracy_sum", 0.0) / accuracy_count
+    return progress.get("average_accuracy", 0.0)
 
 def log_user_activity(user_id: str, activity_type: str, details: dict = None):
     """
-    Log user activity for analytics (placeholder)
+    Log user activity for analytics (buffered; written by the activity flusher)
     """
-    log_entry = {
+    _ACTIVITY_BUFFER.append({
         "user_id": user_id,
         "activity_type": activity_type,
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": iso_timestamp(),
         "details": details or {}
-    }
+    })
     
     # TODO: Implement actual logging to database or analytics service
-    print(f"USER_ACTIVITY: {log_entry}")
+
+def _flush_user_activity():
+    """
+    Write all buffered activity entries to stdout in one call
+    (dropped when there is no stdout, e.g. pythonw or a detached service)
+    """
+    lines = []
+    while _ACTIVITY_BUFFER:
+        entry = _ACTIVITY_BUFFER.popleft()
+        lines.append(b"USER_ACTIVITY: " + orjson.dumps(entry, default=str) + b"\n")
+    stream = sys.stdout
+    if not lines or stream is None:
+        return
+    data = b"".join(lines)
+    buffer = getattr(stream, "buffer", None)
+    if buffer is not None:
+        buffer.write(data)
+    else:
+        # Text-only stdout (e.g. replaced by a logging/test wrapper)
+        stream.write(data.decode("utf-8"))
+    stream.flush()
+
+async def _activity_flush_loop():
+    """
+    Flush buffered user activity once per interval
+    """
+    while True:
+        await asyncio.sleep(_ACTIVITY_FLUSH_SECONDS)
+        try:
+            _flush_user_activity()
+        except Exception as e:
+            print(f"Error writing user activity: {str(e)}")
+
+def start_activity_flusher() -> asyncio.Task:
+    """Start the user activity flusher (call once at app startup)"""
+    return asyncio.create_task(_activity_flush_loop())
+
+async def stop_activity_flusher(task: asyncio.Task):
+    """Stop the flusher and write whatever is still buffered"""
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    try:
+        _flush_user_activity()
+    except Exception as e:
+        print(f"Error writing user activity: {str(e)}")
+
+def iso_timestamp() -> str:
+    """
+    Current local time as an ISO string, formatted at most once per second
+    """
+    now = int(time.time())
+    cache = _timestamp_cache
+    if cache[0] != now:
+        cache[0] = now
+        cache[1] = datetime.fromtimestamp(now).isoformat()
+    return cache[1]
+
+# Pre-keyed response templates; copying one avoids rebuilding the dict key by key
+_SUCCESS_TEMPLATE = {"success": True, "message": "Success", "timestamp": ""}
+_ERROR_TEMPLATE = {"success": False, "message": "Error occurred", "timestamp": ""}
 
 class APIResponse:
     """
@@ -177,18 +406,18 @@ class APIResponse:
     """
     @staticmethod
     def success(data=None, message="Success"):
-        return {
-            "success": True,
-            "message": message,
-            "data": data,
-            "timestamp": datetime.now().isoformat()
-        }
+        response = _SUCCESS_TEMPLATE.copy()
+        response["message"] = message
+        response["timestamp"] = iso_timestamp()
+        if data is not None:
+            response["data"] = data
+        return response
     
     @staticmethod
     def error(message="Error occurred", error_code=None):
-        return {
-            "success": False,
-            "message": message,
-            "error_code": error_code,
-            "timestamp": datetime.now().isoformat()
-        }
+        response = _ERROR_TEMPLATE.copy()
+        response["message"] = message
+        response["timestamp"] = iso_timestamp()
+        if error_code is not None:
+            response["error_code"] = error_code
+        return response